@@ -1,8 +1,20 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db import transaction
 from .models import DocumentRequest, ContactMessage, UserProfile
-from django.utils.html import format_html
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
 from django.utils import timezone
-import uuid
+import os
+import secrets
+
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+
+_ROLE_BADGE = {
+    'student': '🎓',
+    'alumni': '👨‍🎓',
+    'faculty': '👨‍🏫'
+}
 
 # ========================================
 # Admin Actions for Document Requests
@@ -10,27 +22,47 @@ import uuid
 
 @admin.action(description="✅ Mark selected requests as Picked Up")
 def mark_as_picked_up(modeladmin, request, queryset):
-    queryset.update(picked_up=True, picked_up_date=timezone.now(), status='completed')
-    modeladmin.message_user(request, f"{queryset.count()} request(s) marked as picked up successfully.")
+    # Skip rows already picked up so their original pickup date is kept
+    pending = queryset.filter(picked_up=False)
+    user_ids = list(pending.values_list('user_id', flat=True))
+    updated = pending.update(
+        picked_up=True, picked_up_date=timezone.now(), status='completed'
+    )
+    DocumentRequest.invalidate_cached_stats(user_ids)
+    modeladmin.message_user(request, f"{updated} request(s) marked as picked up successfully.")
 
 @admin.action(description="📦 Mark as Ready for Pickup")
 def mark_ready_for_pickup(modeladmin, request, queryset):
-    queryset.update(ready_for_pickup=True, status='ready')
-    modeladmin.message_user(request, f"{queryset.count()} request(s) marked as ready for pickup.")
+    pending = queryset.exclude(ready_for_pickup=True, status='ready')
+    user_ids = list(pending.values_list('user_id', flat=True))
+    updated = pending.update(ready_for_pickup=True, status='ready')
+    DocumentRequest.invalidate_cached_stats(user_ids)
+    modeladmin.message_user(request, f"{updated} request(s) marked as ready for pickup.")
 
 @admin.action(description="💳 Simulate Payment Success")
 def simulate_payment_success(modeladmin, request, queryset):
-    for obj in queryset:
+    now = timezone.now()
+    objs = list(queryset.select_related(None).only('id', 'user', 'payment_status', 'payment_date', 'payment_reference', 'updated_at'))
+    for obj in objs:
         obj.payment_status = 'paid'
-        obj.payment_date = timezone.now()
-        obj.payment_reference = f"SIM-{uuid.uuid4().hex[:8].upper()}"
-        obj.save()
-    modeladmin.message_user(request, f"{queryset.count()} payment(s) simulated successfully.")
+        obj.payment_date = now
+        obj.payment_reference = f"SIM-{secrets.token_hex(6).upper()}"
+        obj.updated_at = now
+    # bulk_update bypasses save(), so auto_now on updated_at is set by hand above
+    DocumentRequest.objects.bulk_update(
+        objs,
+        ['payment_status', 'payment_date', 'payment_reference', 'updated_at'],
+        batch_size=1000
+    )
+    DocumentRequest.invalidate_cached_stats(obj.user_id for obj in objs)
+    modeladmin.message_user(request, f"{len(objs)} payment(s) simulated successfully.")
 
 @admin.action(description="❌ Simulate Payment Failure")
 def simulate_payment_failure(modeladmin, request, queryset):
-    queryset.update(payment_status='failed')
-    modeladmin.message_user(request, f"{queryset.count()} payment(s) marked as failed.")
+    user_ids = list(queryset.values_list('user_id', flat=True))
+    updated = queryset.update(payment_status='failed')
+    DocumentRequest.invalidate_cached_stats(user_ids)
+    modeladmin.message_user(request, f"{updated} payment(s) marked as failed.")
 
 
 # ========================================
@@ -39,13 +71,37 @@ def simulate_payment_failure(modeladmin, request, queryset):
 
 @admin.action(description="✅ Verify Selected Users")
 def verify_users(modeladmin, request, queryset):
-    queryset.update(is_verified=True)
-    modeladmin.message_user(request, f"{queryset.count()} user(s) verified successfully.")
+    updated = queryset.update(is_verified=True)
+    modeladmin.message_user(request, f"{updated} user(s) verified successfully.")
 
 @admin.action(description="❌ Unverify Selected Users")
 def unverify_users(modeladmin, request, queryset):
-    queryset.update(is_verified=False)
-    modeladmin.message_user(request, f"{queryset.count()} user(s) unverified.")
+    updated = queryset.update(is_verified=False)
+    modeladmin.message_user(request, f"{updated} user(s) unverified.")
+
+
+# ========================================
+# Admin ChangeLists
+# ========================================
+
+class DocumentRequestChangeList(ChangeList):
+    """Load only the columns the request list renders"""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # Only load the columns list_display renders; purpose/notes stay on disk
+        return super().get_queryset(request, exclude_parameters).only(
+            'order_id', 'user', 'document_type', 'payment_method', 'payment_status',
+            'payment_reference', 'status', 'ready_for_pickup', 'picked_up', 'created_at',
+            'user__username', 'user__first_name', 'user__last_name',
+            'user__profile__school_id', 'user__profile__role', 'user__profile__is_verified',
+        )
+
+
+class ContactMessageChangeList(ChangeList):
+    """Leave the message body out of the list view"""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).defer('message')
 
 
 # ========================================
@@ -76,6 +132,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     ]
     list_editable = ['is_verified']
     list_display_links = ['school_id', 'get_user_name']
+    list_select_related = ('user',)
     readonly_fields = ['user', 'created_at', 'updated_at', 'get_email_display']
     actions = [verify_users, unverify_users]
     
@@ -103,23 +160,22 @@ class UserProfileAdmin(admin.ModelAdmin):
     
     def get_user_name(self, obj):
         """Display user's full name with link"""
-        full_name = obj.user.get_full_name()
+        user = obj.user
+        full_name = f'{user.first_name} {user.last_name}'.strip()
         if full_name:
             return format_html(
                 '<strong>{}</strong>',
                 full_name
             )
-        return obj.user.username
+        return user.username
     get_user_name.short_description = 'Name'
     get_user_name.admin_order_field = 'user__first_name'
     
     def get_email_display(self, obj):
         """Display user's email as clickable link"""
-        return format_html(
-            '<a href="mailto:{}" style="color: #0073aa;">{}</a>',
-            obj.user.email,
-            obj.user.email
-        )
+        # Escape once and reuse it for both the href and the link text
+        email = escape(obj.user.email)
+        return mark_safe(f'<a href="mailto:{email}" style="color: #0073aa;">{email}</a>')
     get_email_display.short_description = 'Email'
     get_email_display.admin_order_field = 'user__email'
 
@@ -143,6 +199,7 @@ class DocumentRequestAdmin(admin.ModelAdmin):
     ]
     list_editable = ['status', 'ready_for_pickup', 'picked_up']
     list_display_links = ['order_id_display', 'get_user_info']
+    list_select_related = ('user', 'user__profile')
     
     actions = [
         mark_as_picked_up,
@@ -216,6 +273,58 @@ class DocumentRequestAdmin(admin.ModelAdmin):
     
     ordering = ['-created_at']
 
+    # Pre-rendered HTML for cells that only depend on a small, fixed set of values
+    _PAYMENT_METHOD_HTML = {
+        'online': mark_safe('<span style="color: #0073aa;">💳 Online (GCash/Maya)</span>'),
+        'cash': mark_safe('<span style="color: #46b450;">💵 Cash on Pickup</span>'),
+    }
+    _PAYMENT_STATUS_HTML = {
+        'unpaid': mark_safe('<span style="color: orange; font-weight: bold;">⏳ Unpaid</span>'),
+        'paid': mark_safe('<span style="color: green; font-weight: bold;">✅ Paid</span>'),
+        'failed': mark_safe('<span style="color: red; font-weight: bold;">❌ Failed</span>'),
+    }
+    _READY_HTML = mark_safe('<span style="color: green; font-weight: bold;">✅ Ready</span>')
+    _NOT_READY_HTML = mark_safe('<span style="color: red;">❌ Not Ready</span>')
+    _PICKED_UP_HTML = mark_safe('<span style="color: green; font-weight: bold;">✅ Picked Up</span>')
+    _WAITING_HTML = mark_safe('<span style="color: orange;">⏳ Waiting</span>')
+
+    def get_queryset(self, request):
+        # Join user and profile up front; the display methods below touch both on every row
+        return super().get_queryset(request).select_related('user', 'user__profile')
+
+    def get_changelist(self, request, **kwargs):
+        return DocumentRequestChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        """Write list_editable changes with one bulk_update instead of a save() per row"""
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        
+        request._list_editable_objs = []
+        with transaction.atomic():
+            response = super().changelist_view(request, extra_context)
+            objs = request._list_editable_objs
+            if objs:
+                # bulk_update skips DocumentRequest.save() and post_save signals, so set
+                # updated_at by hand and drop the stats caches those hooks would have cleared
+                now = timezone.now()
+                for obj in objs:
+                    obj.updated_at = now
+                DocumentRequest.objects.bulk_update(
+                    objs,
+                    ['status', 'ready_for_pickup', 'picked_up', 'updated_at'],
+                    batch_size=500
+                )
+                DocumentRequest.invalidate_cached_stats(obj.user_id for obj in objs)
+        return response
+
+    def save_model(self, request, obj, form, change):
+        pending = getattr(request, '_list_editable_objs', None)
+        if change and pending is not None:
+            pending.append(obj)
+            return
+        super().save_model(request, obj, form, change)
+
     # Custom display methods
     
     def order_id_display(self, obj):
@@ -229,21 +338,19 @@ class DocumentRequestAdmin(admin.ModelAdmin):
     
     def get_user_info(self, obj):
         """Display user with School ID and role"""
-        if hasattr(obj.user, 'profile'):
-            role_badge = {
-                'student': '🎓',
-                'alumni': '👨‍🎓',
-                'faculty': '👨‍🏫'
-            }
-            icon = role_badge.get(obj.user.profile.role, '👤')
-            verified = '✅' if obj.user.profile.is_verified else '⚠️'
+        # user and user__profile come from list_select_related, so this never queries
+        profile = getattr(obj.user, 'profile', None)
+        if profile is not None:
+            user = obj.user
+            icon = _ROLE_BADGE.get(profile.role, '👤')
+            verified = '✅' if profile.is_verified else '⚠️'
             
             return format_html(
                 '{} <strong>{}</strong><br>'
                 '<small style="color: #666;">School ID: {}</small> {}',
                 icon,
-                obj.user.get_full_name() or obj.user.username,
-                obj.user.profile.school_id,
+                f'{user.first_name} {user.last_name}'.strip() or user.username,
+                profile.school_id,
                 verified
             )
         return obj.user.username
@@ -252,9 +359,10 @@ class DocumentRequestAdmin(admin.ModelAdmin):
     
     def get_user_profile_link(self, obj):
         """Link to user's profile in admin"""
-        if hasattr(obj.user, 'profile'):
+        profile = getattr(obj.user, 'profile', None)
+        if profile is not None:
             from django.urls import reverse
-            url = reverse('admin:docrequest_userprofile_change', args=[obj.user.profile.id])
+            url = reverse('admin:docrequest_userprofile_change', args=[profile.id])
             return format_html(
                 '<a href="{}" style="color: #0073aa;">👤 View User Profile</a>',
                 url
@@ -264,56 +372,42 @@ class DocumentRequestAdmin(admin.ModelAdmin):
 
     def payment_method_display(self, obj):
         """Display payment method with icon"""
-        icons = {
-            'online': '💳',
-            'cash': '💵'
-        }
-        colors = {
-            'online': '#0073aa',
-            'cash': '#46b450'
-        }
-        return format_html(
-            '<span style="color: {};">{} {}</span>',
-            colors.get(obj.payment_method, '#000'),
-            icons.get(obj.payment_method, ''),
-            obj.get_payment_method_display()
-        )
+        return self._PAYMENT_METHOD_HTML.get(obj.payment_method, obj.payment_method)
     payment_method_display.short_description = 'Payment Method'
     
     def payment_status_display(self, obj):
         """Display payment status with color coding"""
-        status_labels = {
-            'unpaid': '<span style="color: orange; font-weight: bold;">⏳ Unpaid</span>',
-            'paid': '<span style="color: green; font-weight: bold;">✅ Paid</span>',
-            'failed': '<span style="color: red; font-weight: bold;">❌ Failed</span>',
-        }
-        display = status_labels.get(obj.payment_status, obj.payment_status)
+        display = self._PAYMENT_STATUS_HTML.get(obj.payment_status, obj.payment_status)
         
         # Add reference if paid
         if obj.payment_status == 'paid' and obj.payment_reference:
-            display += f'<br><small style="color: #666;">Ref: {obj.payment_reference}</small>'
+            return format_html(
+                '{}<br><small style="color: #666;">Ref: {}</small>',
+                display,
+                obj.payment_reference
+            )
         
-        return format_html(display)
+        return display
     payment_status_display.short_description = 'Payment Status'
 
     def ready_for_pickup_display(self, obj):
         """Display ready for pickup status"""
         if obj.ready_for_pickup:
-            return format_html('<span style="color: green; font-weight: bold;">✅ Ready</span>')
-        return format_html('<span style="color: red;">❌ Not Ready</span>')
+            return self._READY_HTML
+        return self._NOT_READY_HTML
     ready_for_pickup_display.short_description = 'Ready for Pickup'
     
     def picked_up_display(self, obj):
         """Display pickup status"""
         if obj.picked_up:
-            date_text = ''
             if obj.picked_up_date:
-                date_text = f'<br><small style="color: #666;">{obj.picked_up_date.strftime("%b %d, %Y")}</small>'
-            return format_html(
-                '<span style="color: green; font-weight: bold;">✅ Picked Up</span>{}',
-                date_text
-            )
-        return format_html('<span style="color: orange;">⏳ Waiting</span>')
+                return format_html(
+                    '{}<br><small style="color: #666;">{}</small>',
+                    self._PICKED_UP_HTML,
+                    obj.picked_up_date.strftime("%b %d, %Y")
+                )
+            return self._PICKED_UP_HTML
+        return self._WAITING_HTML
     picked_up_display.short_description = 'Pickup Status'
 
 
@@ -340,6 +434,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
     ordering = ['-created_at']
 
+    def get_changelist(self, request, **kwargs):
+        return ContactMessageChangeList
+
     def has_attachment(self, obj):
         return bool(obj.attachment)
     has_attachment.boolean = True
@@ -348,9 +445,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
     def attachment_preview(self, obj):
         if obj.attachment:
             file_url = obj.attachment.url
-            file_name = obj.attachment.name.split('/')[-1]
+            file_name = obj.attachment.name.rsplit('/', 1)[-1]
             
-            if any(ext in file_name.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
+            if os.path.splitext(file_name)[1].lower() in _IMAGE_EXTS:
                 return format_html(
                     '<a href="{}" target="_blank">'
                     '<img src="{}" width="150" style="border-radius:5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">'
@@ -0,0 +1,20 @@
+from django.urls import path
+from . import views
+
+# Staff dashboard routes, included under 'dashboard/' by docrequest/urls.py
+urlpatterns = [
+    path('', views.admin_dashboard, name='admin_dashboard'),
+    path('requests/', views.admin_requests, name='admin_requests'),
+    path('request/<str:order_id>/', views.admin_request_detail, name='admin_request_detail'),
+    path('users/', views.admin_users, name='admin_users'),
+    path('payments/', views.admin_payments, name='admin_payments'),
+    path('messages/', views.admin_contact_messages, name='admin_contact_messages'),
+    path('user/verify/<int:profile_id>/', views.admin_verify_user, name='admin_verify_user'),
+    path('request/delete/<str:order_id>/', views.admin_delete_request, name='admin_delete_request'),
+    path('message/<int:message_id>/', views.admin_contact_message_detail, name='admin_contact_message_detail'),
+    path('message/delete/<int:message_id>/', views.admin_delete_contact_message, name='admin_delete_contact_message'),
+    path('payment/<int:transaction_id>/', views.admin_payment_detail, name='admin_payment_detail'),
+    path('payment/refund/<str:order_id>/', views.admin_issue_refund, name='admin_issue_refund'),
+    path('payment/approve-refund/<int:transaction_id>/', views.admin_approve_refund, name='admin_approve_refund'),
+    path('payment/reports/', views.admin_payment_reports, name='admin_payment_reports'),
+]
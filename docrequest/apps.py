@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueListener
+
+
+def _restart_queue_listener(handler):
+    """Give a forked child its own queue and listener thread (threads don't survive fork)"""
+    old = handler.listener
+    handler.queue = queue.Queue(-1)
+    handler.listener = QueueListener(
+        handler.queue, *old.handlers, respect_handler_level=old.respect_handler_level
+    )
+    handler.listener.start()
 
 
 class DocrequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'docrequest'
+    
+    def ready(self):
+        """Start the LOGGING 'queue' handler's listener in this process and every forked worker"""
+        get_handler = getattr(logging, 'getHandlerByName', None)  # Python 3.12+
+        handler = get_handler('queue') if get_handler else None
+        if getattr(handler, 'listener', None) is None:
+            return
+        
+        handler.listener.start()
+        # Pre-forking servers (gunicorn --preload) call ready() once in the master;
+        # each worker needs its own running listener or its records are never written
+        os.register_at_fork(after_in_child=lambda: _restart_queue_listener(handler))
+        atexit.register(lambda: handler.listener.stop())
@@ -2,8 +2,8 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from .models import DocumentRequest, ContactMessage, UserProfile
-import re
 
 YEAR_LEVEL_CHOICES = [
     ('1st Year', '1st Year'),
@@ -112,7 +112,7 @@ class RegisterForm(UserCreationForm):
         school_id = self.cleaned_data.get('school_id')
         
         # Validate format: 8 digits
-        if not re.match(r'^\d{8}$', school_id):
+        if len(school_id) != 8 or not school_id.isdecimal():
             raise ValidationError('School ID must be exactly 8 digits (e.g., 20230574)')
         
         # Validate year prefix (2000-2030)
@@ -120,12 +120,10 @@ class RegisterForm(UserCreationForm):
         if not (2000 <= year_prefix <= 2030):
             raise ValidationError('School ID must start with a valid year (2000-2030)')
         
-        # Check if School ID already exists
-        if UserProfile.objects.filter(school_id=school_id).exists():
-            raise ValidationError('This School ID is already registered')
-        
-        # Check if username (school_id) already exists
-        if User.objects.filter(username=school_id).exists():
+        # Check if School ID is already taken as a username or a profile's School ID
+        # (two separate seeks: an OR across the profile join can use neither unique index)
+        if (User.objects.filter(username=school_id).exists()
+                or UserProfile.objects.filter(school_id=school_id).exists()):
             raise ValidationError('This School ID is already registered')
         
         return school_id
@@ -150,16 +148,19 @@ class RegisterForm(UserCreationForm):
         user.email = f"{school_id}@cityofmalabonuniversity.edu.ph"
         
         if commit:
-            user.save()
-            
-            # Create or update UserProfile
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            profile.school_id = school_id
-            profile.role = self.cleaned_data.get('role')
-            profile.department = self.cleaned_data.get('department', '')
-            profile.course = self.cleaned_data.get('course', '')
-            profile.year_level = self.cleaned_data.get('year_level', '')
-            profile.save()
+            with transaction.atomic():
+                user.save()
+                
+                # The post_save signal defers its default profile until commit, so
+                # create the real one here with a single INSERT
+                UserProfile.objects.create(
+                    user=user,
+                    school_id=school_id,
+                    role=self.cleaned_data.get('role'),
+                    department=self.cleaned_data.get('department', ''),
+                    course=self.cleaned_data.get('course', ''),
+                    year_level=self.cleaned_data.get('year_level', '')
+                )
         
         return user
 
@@ -199,7 +200,7 @@ class LoginForm(AuthenticationForm):
         username = self.cleaned_data.get('username')
         
         # Validate format: 8 digits
-        if not re.match(r'^\d{8}$', username):
+        if len(username) != 8 or not username.isdecimal():
             raise ValidationError('Please enter your 8-digit School ID (e.g., 20230574)')
         
         return username
@@ -305,13 +306,17 @@ class DocumentRequestForm(forms.ModelForm):
         """Validate that user doesn't have an active request"""
         cleaned_data = super().clean()
         
-        # Check if user already has an active request
-        if self.user and DocumentRequest.user_has_active_request(self.user):
-            active_request = DocumentRequest.get_user_active_request(self.user)
-            raise ValidationError(
-                f'You already have an active request (Order ID: {active_request.order_id}). '
-                f'Please wait until your current request is completed or rejected before submitting a new one.'
-            )
+        # Check if user already has an active request (only the order ID is needed)
+        if self.user:
+            active_order_id = DocumentRequest.objects.filter(
+                user=self.user,
+                status__in=DocumentRequest.ACTIVE_STATUSES
+            ).values_list('order_id', flat=True).first()
+            if active_order_id is not None:
+                raise ValidationError(
+                    f'You already have an active request (Order ID: {active_order_id}). '
+                    f'Please wait until your current request is completed or rejected before submitting a new one.'
+                )
         
         return cleaned_data
 
@@ -1,14 +1,15 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from docrequest.models import DocumentRequest, PaymentTransaction
 
+BATCH_SIZE = 1000
+
+
 class Command(BaseCommand):
     help = 'Create PaymentTransaction records for existing paid requests'
 
     def handle(self, *args, **kwargs):
-        created_count = 0
-        skipped_count = 0
-        
         self.stdout.write(self.style.WARNING('='*60))
         self.stdout.write(self.style.WARNING('Backfilling Payment Transactions...'))
         self.stdout.write(self.style.WARNING('='*60 + '\n'))
@@ -16,42 +17,48 @@ class Command(BaseCommand):
         # Get all paid requests
         paid_requests = DocumentRequest.objects.filter(payment_status='paid')
         
-        self.stdout.write(f'Found {paid_requests.count()} paid request(s)\n')
+        total_paid = paid_requests.count()
         
-        for req in paid_requests:
-            # Check if payment transaction already exists
-            existing_txn = PaymentTransaction.objects.filter(
-                request=req,
-                transaction_type='payment'
-            ).first()
-            
-            if existing_txn:
-                skipped_count += 1
-                self.stdout.write(f'  ⊗ Skipped {req.order_id} - transaction already exists')
-                continue
-            
-            # Create payment transaction
-            PaymentTransaction.objects.create(
-                request=req,
-                transaction_type='payment',
-                amount=req.payment_amount,
-                status='completed',
-                payment_method=req.payment_method,
-                processed_at=req.payment_date or req.created_at,
-                notes=f"Backfilled payment transaction for {req.order_id}"
-            )
+        self.stdout.write(f'Found {total_paid} paid request(s)\n')
+        
+        payment_txns = PaymentTransaction.objects.filter(transaction_type='payment')
+        existing_before = payment_txns.count()
+        
+        # Requests that already have a payment transaction are skipped by the
+        # uniq_request_payment_txn constraint at insert time (ignore_conflicts)
+        batch = []
+        with transaction.atomic():
+            for req in paid_requests.only(
+                'id', 'order_id', 'payment_amount', 'payment_method', 'payment_date', 'created_at'
+            ).iterator(chunk_size=2000):
+                # bulk_create skips save(), so the reference number is generated here
+                batch.append(PaymentTransaction(
+                    request=req,
+                    transaction_type='payment',
+                    amount=req.payment_amount,
+                    status='completed',
+                    reference_number=PaymentTransaction.generate_reference_number(),
+                    payment_method=req.payment_method,
+                    processed_at=req.payment_date or req.created_at,
+                    notes=f"Backfilled payment transaction for {req.order_id}"
+                ))
+                
+                if len(batch) >= BATCH_SIZE:
+                    self._flush(batch)
+                    batch = []
             
-            created_count += 1
-            self.stdout.write(
-                self.style.SUCCESS(f'  ✅ Created payment transaction for {req.order_id} - ₱{req.payment_amount}')
-            )
+            if batch:
+                self._flush(batch)
+        
+        created_count = payment_txns.count() - existing_before
+        skipped_count = total_paid - created_count
         
         self.stdout.write('\n' + '='*60)
         self.stdout.write(self.style.SUCCESS('SUMMARY:'))
         self.stdout.write('='*60)
         self.stdout.write(f'  • Transactions created: {created_count}')
         self.stdout.write(f'  • Already existed:      {skipped_count}')
-        self.stdout.write(f'  • Total processed:      {paid_requests.count()}')
+        self.stdout.write(f'  • Total processed:      {total_paid}')
         self.stdout.write('='*60 + '\n')
         
         if created_count > 0:
@@ -61,4 +68,8 @@ class Command(BaseCommand):
         else:
             self.stdout.write(
                 self.style.SUCCESS('✅ All paid requests already have payment transactions!\n')
-            )
\ No newline at end of file
+            )
+    
+    def _flush(self, batch):
+        PaymentTransaction.objects.bulk_create(batch, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        self.stdout.write(f'  • Processed {len(batch)} paid request(s)')
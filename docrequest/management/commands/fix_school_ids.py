@@ -1,11 +1,27 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from docrequest.models import UserProfile
 
+BATCH_SIZE = 2000
+LOG_FLUSH_EVERY = 500
+
+
 class Command(BaseCommand):
     help = 'Fix missing or empty school_ids for existing user profiles'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            help='Only print the summary report, not one line per user',
+        )
+
     def handle(self, *args, **kwargs):
+        self.quiet = kwargs.get('quiet', False)
+        self._log_buf = []
+        
         fixed_count = 0
         created_count = 0
         already_valid = 0
@@ -14,65 +30,86 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING('Starting School ID Fix Process...'))
         self.stdout.write(self.style.WARNING('='*60 + '\n'))
         
-        # Process all users
-        all_users = User.objects.all()
+        # Process all users (profile joined in, so no per-user lookups)
+        all_users = User.objects.select_related('profile').only(
+            'id', 'username', 'is_staff', 'is_superuser', 'profile__user_id', 'profile__school_id'
+        )
         total_users = all_users.count()
         
         self.stdout.write(f'Found {total_users} user(s) to process...\n')
         
-        for user in all_users:
-            # Skip superuser if no profile needed
-            if user.is_superuser and not hasattr(user, 'profile'):
-                self.stdout.write(
-                    self.style.WARNING(f'⊗ Skipping superuser: {user.username}')
-                )
-                continue
-            
-            # Check if user has a profile
-            if not hasattr(user, 'profile'):
-                # Create profile
-                if user.username.isdigit() and len(user.username) == 8:
-                    school_id = user.username
-                else:
-                    # Generate school_id: current year + user ID (padded to 4 digits)
-                    school_id = f"{2025}{user.id:04d}"
+        to_create = []
+        to_fix = []
+        now = timezone.now()
+        
+        # Commit every create/fix once at the end instead of per statement
+        with transaction.atomic():
+            for user in all_users.iterator(chunk_size=BATCH_SIZE):
+                # The joined row is already cached, so a missing profile raises without a query
+                try:
+                    profile = user.profile
+                except UserProfile.DoesNotExist:
+                    profile = None
                 
-                profile = UserProfile.objects.create(
-                    user=user,
-                    school_id=school_id,
-                    role='student',
-                    is_verified=user.is_staff or user.is_superuser
-                )
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'✅ Created profile for: {user.username:15} (ID: {user.id:3}) → School ID: {school_id}'
+                # Skip superuser if no profile needed
+                if user.is_superuser and profile is None:
+                    self._log(
+                        self.style.WARNING(f'⊗ Skipping superuser: {user.username}')
                     )
-                )
-            else:
-                profile = user.profile
+                    continue
                 
-                # Check if school_id is empty or None
-                if not profile.school_id or profile.school_id.strip() == '':
-                    # Try to use username if it's valid
+                # Check if user has a profile
+                if profile is None:
+                    # Create profile
                     if user.username.isdigit() and len(user.username) == 8:
-                        profile.school_id = user.username
+                        school_id = user.username
                     else:
-                        # Generate school_id
-                        profile.school_id = f"{2025}{user.id:04d}"
+                        # Generate school_id: current year + user ID (padded to 4 digits)
+                        school_id = f"{2025}{user.id:04d}"
                     
-                    profile.save()
-                    fixed_count += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'⚠️  Fixed empty ID for: {user.username:15} (ID: {user.id:3}) → School ID: {profile.school_id}'
+                    to_create.append(UserProfile(
+                        user=user,
+                        school_id=school_id,
+                        role='student',
+                        is_verified=user.is_staff or user.is_superuser
+                    ))
+                    created_count += 1
+                    self._log(
+                        self.style.SUCCESS(
+                            f'✅ Created profile for: {user.username:15} (ID: {user.id:3}) → School ID: {school_id}'
                         )
                     )
                 else:
-                    already_valid += 1
-                    self.stdout.write(
-                        f'   Valid profile for: {user.username:15} (ID: {user.id:3}) → School ID: {profile.school_id}'
-                    )
+                    # Check if school_id is empty or None
+                    if not profile.school_id or profile.school_id.strip() == '':
+                        # Try to use username if it's valid
+                        if user.username.isdigit() and len(user.username) == 8:
+                            profile.school_id = user.username
+                        else:
+                            # Generate school_id
+                            profile.school_id = f"{2025}{user.id:04d}"
+                        
+                        profile.updated_at = now
+                        to_fix.append(profile)
+                        fixed_count += 1
+                        self._log(
+                            self.style.WARNING(
+                                f'⚠️  Fixed empty ID for: {user.username:15} (ID: {user.id:3}) → School ID: {profile.school_id}'
+                            )
+                        )
+                    else:
+                        already_valid += 1
+                        self._log(
+                            f'   Valid profile for: {user.username:15} (ID: {user.id:3}) → School ID: {profile.school_id}'
+                        )
+                
+                # Flush pending writes so memory stays bounded on large user tables
+                if len(to_create) + len(to_fix) >= BATCH_SIZE:
+                    self._flush(to_create, to_fix)
+                    to_create, to_fix = [], []
+            
+            self._flush(to_create, to_fix)
+        self._flush_log()
         
         # Summary
         self.stdout.write('\n' + '='*60)
@@ -99,4 +136,32 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING('📋 Next Steps:'))
         self.stdout.write('  1. Visit /admin/docrequest/userprofile/ to verify')
         self.stdout.write('  2. Log in as a user to test the navigation dropdown')
-        self.stdout.write('  3. Check that School ID appears in user profile\n')
\ No newline at end of file
+        self.stdout.write('  3. Check that School ID appears in user profile\n')
+    
+    def _flush(self, to_create, to_fix):
+        """Write buffered profile creates and school_id fixes"""
+        if to_create:
+            # Upsert on user so a profile created concurrently (e.g. by the post_save
+            # signal's on_commit callback) just gets its school_id set
+            UserProfile.objects.bulk_create(
+                to_create,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['school_id', 'updated_at'],
+                batch_size=1000
+            )
+        if to_fix:
+            UserProfile.objects.bulk_update(to_fix, ['school_id', 'updated_at'], batch_size=1000)
+    
+    def _log(self, line):
+        """Buffer a per-user line and write it out in chunks"""
+        if self.quiet:
+            return
+        self._log_buf.append(line)
+        if len(self._log_buf) >= LOG_FLUSH_EVERY:
+            self._flush_log()
+    
+    def _flush_log(self):
+        if self._log_buf:
+            self.stdout.write('\n'.join(self._log_buf))
+            self._log_buf.clear()
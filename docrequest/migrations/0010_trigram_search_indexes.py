@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from ._postgres import PostgresRunSQL
+
+
+# icontains compiles to UPPER(col::text) LIKE UPPER(%s) on PostgreSQL, so the
+# trigram indexes are built on that same expression.
+FORWARD_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm;',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS userprofile_school_id_trgm '
+    'ON docrequest_userprofile USING gin ((UPPER(school_id::text)) gin_trgm_ops);',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_trgm '
+    'ON auth_user USING gin ((UPPER(email::text)) gin_trgm_ops);',
+]
+
+REVERSE_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS userprofile_school_id_trgm;',
+    'DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_trgm;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('docrequest', '0009_alter_documentrequest_payment_status'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        PostgresRunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
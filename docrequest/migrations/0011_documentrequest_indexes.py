@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0010_trigram_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='docreq_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['status', '-created_at'], name='docreq_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['ready_for_pickup', 'picked_up'], name='dr_pickup_idx'),
+        ),
+    ]
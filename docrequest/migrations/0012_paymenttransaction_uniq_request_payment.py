@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def reclassify_duplicate_payments(apps, schema_editor):
+    """Keep one 'payment' row per request (completed first, then oldest); the rest become adjustments"""
+    PaymentTransaction = apps.get_model('docrequest', 'PaymentTransaction')
+    duplicated = (
+        PaymentTransaction.objects.filter(transaction_type='payment')
+        .values('request_id')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .values_list('request_id', flat=True)
+    )
+    for request_id in list(duplicated):
+        payments = sorted(
+            PaymentTransaction.objects.filter(request_id=request_id, transaction_type='payment'),
+            key=lambda txn: (txn.status != 'completed', txn.id)
+        )
+        for txn in payments[1:]:
+            txn.transaction_type = 'adjustment'
+            txn.notes = f"{txn.notes}\n[Duplicate payment record reclassified by migration 0012]".strip()
+            txn.save(update_fields=['transaction_type', 'notes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0011_documentrequest_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(reclassify_duplicate_payments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymenttransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('transaction_type', 'payment')), fields=('request', 'transaction_type'), name='uniq_request_payment_txn'),
+        ),
+    ]
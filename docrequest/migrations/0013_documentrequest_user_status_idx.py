@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0012_paymenttransaction_uniq_request_payment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['user', 'status'], name='docreq_user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0013_documentrequest_user_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='school_id',
+            field=models.CharField(help_text='8-digit School ID (e.g., 20230574)', max_length=8),
+        ),
+        migrations.AddConstraint(
+            model_name='userprofile',
+            constraint=models.UniqueConstraint(fields=('school_id',), name='uniq_school_id'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:39
+
+import docrequest.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0014_userprofile_uniq_school_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentrequest',
+            name='order_id',
+            field=models.CharField(blank=True, default=docrequest.models.generate_order_id, editable=False, help_text='Unique order identifier (e.g., DOC-20250109-A3F2)', max_length=20, unique=True),
+        ),
+    ]
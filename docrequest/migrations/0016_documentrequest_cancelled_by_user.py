@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_user_cancellations(apps, schema_editor):
+    """Flag requests cancelled before the column existed (marked only in notes)"""
+    DocumentRequest = apps.get_model('docrequest', 'DocumentRequest')
+    DocumentRequest.objects.filter(
+        status='rejected',
+        notes__contains='[CANCELLED BY USER'
+    ).update(cancelled_by_user=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0015_documentrequest_order_id_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentrequest',
+            name='cancelled_by_user',
+            field=models.BooleanField(default=False, help_text='Set when the user cancelled this request themselves'),
+        ),
+        migrations.RunPython(mark_user_cancellations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(condition=models.Q(('cancelled_by_user', True)), fields=['cancelled_by_user', 'status'], name='docreq_cancelled_partial'),
+        ),
+    ]
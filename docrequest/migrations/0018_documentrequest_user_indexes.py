@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0016_documentrequest_cancelled_by_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['user', '-created_at'], name='docreq_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['user', 'payment_status'], name='docreq_user_payment_idx'),
+        ),
+    ]
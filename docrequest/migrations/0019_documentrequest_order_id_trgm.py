@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from ._postgres import PostgresRunSQL
+
+
+# Same UPPER(col::text) expression that icontains compiles to on PostgreSQL (see
+# 0010_trigram_search_indexes, which also creates the pg_trgm extension).
+FORWARD_SQL = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS docreq_oid_trgm '
+    'ON docrequest_documentrequest USING gin ((UPPER(order_id::text)) gin_trgm_ops);',
+]
+
+REVERSE_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS docreq_oid_trgm;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('docrequest', '0018_documentrequest_user_indexes'),
+    ]
+
+    operations = [
+        PostgresRunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
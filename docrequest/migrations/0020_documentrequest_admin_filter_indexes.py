@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0019_documentrequest_order_id_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['payment_status', '-created_at'], name='docreq_paystatus_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['document_type'], name='docreq_doctype_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from ._postgres import PostgresRunSQL
+
+
+# Trigram indexes for the remaining auth_user columns that the admin_requests and
+# admin_users searches match with icontains. Same UPPER(col::text) expression as
+# 0010_trigram_search_indexes, which already covers email and school_id.
+FORWARD_SQL = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_first_name_trgm '
+    'ON auth_user USING gin ((UPPER(first_name::text)) gin_trgm_ops);',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_last_name_trgm '
+    'ON auth_user USING gin ((UPPER(last_name::text)) gin_trgm_ops);',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_username_trgm '
+    'ON auth_user USING gin ((UPPER(username::text)) gin_trgm_ops);',
+]
+
+REVERSE_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS auth_user_first_name_trgm;',
+    'DROP INDEX CONCURRENTLY IF EXISTS auth_user_last_name_trgm;',
+    'DROP INDEX CONCURRENTLY IF EXISTS auth_user_username_trgm;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('docrequest', '0020_documentrequest_admin_filter_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        PostgresRunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from ._postgres import PostgresRunSQL
+
+
+# Plain btree index on auth_user.email so edit_profile's "email already in use"
+# exists() check is an index seek. auth_user is a contrib table, so this follows
+# the same raw SQL approach as 0021_auth_user_name_trigram_indexes.
+FORWARD_SQL = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_idx ON auth_user (email);',
+]
+
+REVERSE_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_idx;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('docrequest', '0021_auth_user_name_trigram_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        PostgresRunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-15 10:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0023_auth_user_email_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('cancelled', 'Cancelled by user'), ('refunded', 'Refund issued')], max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='docrequest.documentrequest')),
+            ],
+            options={
+                'verbose_name': 'Request Event',
+                'verbose_name_plural': 'Request Events',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['request', '-created_at'], name='reqevent_request_created_idx')],
+            },
+        ),
+    ]
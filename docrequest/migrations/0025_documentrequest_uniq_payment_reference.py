@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-15 11:02
+
+from django.conf import settings
+from django.db import migrations, models
+import secrets
+
+
+def regenerate_duplicate_references(apps, schema_editor):
+    """Keep the oldest request on each duplicated payment_reference; give the rest fresh references"""
+    DocumentRequest = apps.get_model('docrequest', 'DocumentRequest')
+    duplicated = (
+        DocumentRequest.objects.exclude(payment_reference__isnull=True)
+        .exclude(payment_reference='')
+        .values('payment_reference')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .values_list('payment_reference', flat=True)
+    )
+    for reference in list(duplicated):
+        prefix = reference.split('-', 1)[0] or 'REF'
+        for doc_request in DocumentRequest.objects.filter(payment_reference=reference).order_by('id')[1:]:
+            new_reference = f"{prefix}-{secrets.token_hex(6).upper()}"
+            while DocumentRequest.objects.filter(payment_reference=new_reference).exists():
+                new_reference = f"{prefix}-{secrets.token_hex(6).upper()}"
+            doc_request.payment_reference = new_reference
+            doc_request.save(update_fields=['payment_reference'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docrequest', '0024_requestevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_references, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='documentrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('payment_reference', ''), _negated=True), fields=('payment_reference',), name='uniq_payment_reference'),
+        ),
+    ]
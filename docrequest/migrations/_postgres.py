@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """RunSQL that only runs on PostgreSQL (sqlite dev/test databases skip it)
+
+    The raw index migrations use CREATE/DROP INDEX CONCURRENTLY, which cannot run
+    inside a transaction, so migrations using this operation set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -1,10 +1,49 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils.safestring import mark_safe
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+import time
 import uuid
 from datetime import datetime
+from decimal import Decimal
+
+
+# Document fees in PHP, keyed by DocumentRequest.document_type
+_DOCUMENT_PRICING = {
+    'transcript': Decimal('150.00'),
+    'diploma': Decimal('200.00'),
+    'grade_report': Decimal('50.00'),
+    'enrollment_cert': Decimal('50.00'),
+    'good_moral': Decimal('50.00'),
+    'transfer_cert': Decimal('100.00'),
+    'other': Decimal('50.00'),
+}
+_DEFAULT_PRICE = Decimal('50.00')
+
+# Cache key for the staff dashboard counters (see views._compute_dashboard_stats)
+ADMIN_DASHBOARD_STATS_KEY = 'admin_dashboard_stats_v1'
+
+
+# [epoch second, 'YYYYMMDD'] for the ID generators below
+_date_cache = [0, '']
+
+
+def today_str():
+    """Today's date as YYYYMMDD, re-formatted at most once per second"""
+    now = int(time.time())
+    if now != _date_cache[0]:
+        _date_cache[:] = [now, datetime.now().strftime('%Y%m%d')]
+    return _date_cache[1]
+
+
+def generate_order_id():
+    """Generate unique Order ID format: DOC-YYYYMMDD-XXXXXXX"""
+    date_part = today_str()
+    # 7 hex chars (28 bits) is the most that fits order_id's max_length of 20
+    unique_part = uuid.uuid4().hex[:7].upper()
+    return f"DOC-{date_part}-{unique_part}"
 
 
 def contact_attachment_upload_path(instance, filename):
@@ -25,7 +64,6 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     school_id = models.CharField(
         max_length=8,
-        unique=True,
         help_text="8-digit School ID (e.g., 20230574)"
     )
     role = models.CharField(
@@ -68,6 +106,9 @@ class UserProfile(models.Model):
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
         ordering = ['school_id']
+        constraints = [
+            models.UniqueConstraint(fields=['school_id'], name='uniq_school_id'),
+        ]
     
     def __str__(self):
         return f"{self.school_id} - {self.user.get_full_name()} ({self.get_role_display()})"
@@ -87,39 +128,30 @@ class UserProfile(models.Model):
 
 
 # ✅ Signal to auto-create UserProfile when User is created
-# Update the existing signal in models.py
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    """Create UserProfile automatically when a User is created"""
-    if created:
-        # Generate school_id from username or user ID
-        if instance.username.isdigit() and len(instance.username) == 8:
-            school_id = instance.username
-        else:
-            school_id = f"{2023}{instance.id:04d}"
-        
-        UserProfile.objects.get_or_create(
-            user=instance,
-            defaults={
-                'school_id': school_id,
-                'role': 'student',
-                'is_verified': instance.is_staff or instance.is_superuser
-            }
-        )
-
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    """Create UserProfile automatically once the new User has been committed"""
+    if not created or raw:
+        return
+    
+    # Generate school_id from username or user ID
+    if instance.username.isdigit() and len(instance.username) == 8:
+        school_id = instance.username
+    else:
+        school_id = f"{2023}{instance.id:04d}"
+    
+    # Runs after the user's transaction commits (immediately in autocommit mode).
+    # get_or_create because callers such as RegisterForm may have already created
+    # the profile with full details inside that transaction.
+    transaction.on_commit(lambda: UserProfile.objects.get_or_create(
+        user=instance,
+        defaults={
+            'school_id': school_id,
+            'role': 'student',
+            'is_verified': instance.is_staff or instance.is_superuser
+        }
+    ))
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save UserProfile whenever User is saved"""
-    if hasattr(instance, 'profile'):
-        profile = instance.profile
-        # Fix empty school_id
-        if not profile.school_id or profile.school_id.strip() == '':
-            if instance.username.isdigit() and len(instance.username) == 8:
-                profile.school_id = instance.username
-            else:
-                profile.school_id = f"{2023}{instance.id:04d}"
-            profile.save()
 
 class DocumentRequest(models.Model):
     STATUS_CHOICES = [
@@ -153,13 +185,19 @@ class DocumentRequest(models.Model):
         ('partially_refunded', 'Partially Refunded'),
     ]
     
+    # Statuses that block the user from submitting another request
+    ACTIVE_STATUSES = ['pending', 'processing', 'ready']
+    
+    # Seconds a user's per-status counts stay cached (see get_user_stats)
+    STATS_CACHE_TTL = 30
+    
     # Unique Order ID
     order_id = models.CharField(
         max_length=20,
         unique=True,
         editable=False,
         blank=True,
-        default='',  
+        default=generate_order_id,
         help_text="Unique order identifier (e.g., DOC-20250109-A3F2)"
     )
     
@@ -169,6 +207,10 @@ class DocumentRequest(models.Model):
     purpose = models.TextField(help_text="Reason for requesting this document")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, null=True, help_text="Additional notes or special instructions")
+    cancelled_by_user = models.BooleanField(
+        default=False,
+        help_text="Set when the user cancelled this request themselves"
+    )
     
     # Payment Info
     payment_method = models.CharField(
@@ -256,6 +298,38 @@ class DocumentRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Document Request'
         verbose_name_plural = 'Document Requests'
+        indexes = [
+            # (-created_at, -id) also backs the keyset pagination in admin_requests
+            models.Index(fields=['-created_at', '-id'], name='docreq_created_id_idx'),
+            # Status-filtered lists ordered newest first; also serves plain status filters
+            models.Index(fields=['status', '-created_at'], name='docreq_status_created_idx'),
+            # user_has_active_request / get_user_active_request filter
+            models.Index(fields=['user', 'status'], name='docreq_user_status_idx'),
+            # Per-user lists ordered newest first (home, my_requests, request pages)
+            models.Index(fields=['user', '-created_at'], name='docreq_user_created_idx'),
+            # my_requests payment_status filter
+            models.Index(fields=['user', 'payment_status'], name='docreq_user_payment_idx'),
+            # admin_requests pickup_status filter and the ready-for-pickup counts
+            models.Index(fields=['ready_for_pickup', 'picked_up'], name='dr_pickup_idx'),
+            # admin_requests payment_status filter newest first, plus the paid/unpaid/failed
+            # lookups and counts (dashboard, confirm_payment, backfill command)
+            models.Index(fields=['payment_status', '-created_at'], name='docreq_paystatus_created_idx'),
+            # admin_requests document_type filter
+            models.Index(fields=['document_type'], name='docreq_doctype_idx'),
+            models.Index(
+                fields=['cancelled_by_user', 'status'],
+                name='docreq_cancelled_partial',
+                condition=models.Q(cancelled_by_user=True)
+            ),
+        ]
+        constraints = [
+            # A colliding SIM-/BULK-/CASH- reference fails the write instead of aliasing two payments
+            models.UniqueConstraint(
+                fields=['payment_reference'],
+                condition=~models.Q(payment_reference=''),
+                name='uniq_payment_reference'
+            ),
+        ]
     
     def __str__(self):
         if self.order_id:
@@ -263,38 +337,38 @@ class DocumentRequest(models.Model):
         return f"{self.user.username} - {self.get_document_type_display()}"
     
     def save(self, *args, **kwargs):
+        # order_id is filled in by its field default when the instance is built;
+        # this only covers callers that explicitly blanked it
         if not self.order_id:
-            self.order_id = self.generate_order_id()
+            self.order_id = generate_order_id()
         
         # Auto-set payment amount based on document type
         if not self.payment_amount:
             self.payment_amount = self.calculate_payment_amount()
         
         # ✅ Auto-fill school_id from user profile if not set
-        if not self.school_id and hasattr(self.user, 'profile'):
-            self.school_id = self.user.profile.school_id
+        # (only touch the profile relation when it is actually needed)
+        if not self.school_id:
+            profile = getattr(self.user, 'profile', None)
+            if profile is not None:
+                self.school_id = profile.school_id
         
         super().save(*args, **kwargs)
+        cache.delete(self.stats_cache_key(self.user_id))
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        cache.delete(self.stats_cache_key(self.user_id))
+        return result
     
     @staticmethod
     def generate_order_id():
-        """Generate unique Order ID format: DOC-YYYYMMDD-XXXX"""
-        date_part = datetime.now().strftime('%Y%m%d')
-        unique_part = str(uuid.uuid4().hex[:4]).upper()
-        return f"DOC-{date_part}-{unique_part}"
+        """Generate unique Order ID format: DOC-YYYYMMDD-XXXXXXX"""
+        return generate_order_id()
     
     def calculate_payment_amount(self):
         """Calculate payment amount based on document type"""
-        pricing = {
-            'transcript': 150.00,
-            'diploma': 200.00,
-            'grade_report': 50.00,
-            'enrollment_cert': 50.00,
-            'good_moral': 50.00,
-            'transfer_cert': 100.00,
-            'other': 50.00,
-        }
-        return pricing.get(self.document_type, 50.00)
+        return _DOCUMENT_PRICING.get(self.document_type, _DEFAULT_PRICE)
     
     def requires_payment(self):
         """Check if document type requires payment"""
@@ -320,20 +394,46 @@ class DocumentRequest(models.Model):
     @staticmethod
     def user_has_active_request(user):
         """Check if user has any active (non-completed/non-rejected) requests"""
-        active_statuses = ['pending', 'processing', 'ready']
         return DocumentRequest.objects.filter(
             user=user,
-            status__in=active_statuses
+            status__in=DocumentRequest.ACTIVE_STATUSES
         ).exists()
     
+    @staticmethod
+    def stats_cache_key(user_id):
+        return f'docreq:stats:{user_id}'
+    
+    @staticmethod
+    def invalidate_cached_stats(user_ids):
+        """Drop cached user and dashboard stats after a write that skips save() and signals"""
+        keys = [DocumentRequest.stats_cache_key(user_id) for user_id in set(user_ids)]
+        cache.delete_many(keys + [ADMIN_DASHBOARD_STATS_KEY])
+    
+    @staticmethod
+    def get_user_stats(user):
+        """Per-status counts of the user's requests, cached for STATS_CACHE_TTL seconds"""
+        # save()/delete() drop the entry; bulk writes call invalidate_cached_stats()
+        return cache.get_or_set(
+            DocumentRequest.stats_cache_key(user.pk),
+            lambda: DocumentRequest.objects.filter(user=user).aggregate(
+                total=models.Count('id'),
+                pending=models.Count('id', filter=models.Q(status='pending')),
+                processing=models.Count('id', filter=models.Q(status='processing')),
+                ready=models.Count('id', filter=models.Q(status='ready')),
+                ready_for_pickup=models.Count('id', filter=models.Q(ready_for_pickup=True, picked_up=False)),
+                completed=models.Count('id', filter=models.Q(status='completed')),
+            ),
+            DocumentRequest.STATS_CACHE_TTL
+        )
+    
     @staticmethod
     def get_user_active_request(user):
         """Get user's current active request if any"""
-        active_statuses = ['pending', 'processing', 'ready']
+        # Only the columns the active-request banners and warnings show
         return DocumentRequest.objects.filter(
             user=user,
-            status__in=active_statuses
-        ).first()
+            status__in=DocumentRequest.ACTIVE_STATUSES
+        ).only('id', 'order_id', 'document_type', 'status', 'payment_status').first()
     
     def can_be_cancelled(self):
         """Check if request can be cancelled by user"""
@@ -341,7 +441,7 @@ class DocumentRequest(models.Model):
     
     def is_cancelled(self):
         """Check if request was cancelled"""
-        return self.status == 'rejected' and '[CANCELLED BY USER' in (self.notes or '')
+        return self.status == 'rejected' and self.cancelled_by_user
 
 
 class ContactMessage(models.Model):
@@ -433,6 +533,14 @@ class PaymentTransaction(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Payment Transaction'
         verbose_name_plural = 'Payment Transactions'
+        constraints = [
+            # A request is paid for at most once; refunds/adjustments may repeat
+            models.UniqueConstraint(
+                fields=['request', 'transaction_type'],
+                condition=models.Q(transaction_type='payment'),
+                name='uniq_request_payment_txn'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_transaction_type_display()} - {self.request.order_id} - ₱{self.amount}"
@@ -445,6 +553,49 @@ class PaymentTransaction(models.Model):
     @staticmethod
     def generate_reference_number():
         """Generate unique transaction reference"""
-        prefix = datetime.now().strftime('%Y%m%d')
-        unique = uuid.uuid4().hex[:6].upper()
-        return f"TXN-{prefix}-{unique}"
\ No newline at end of file
+        prefix = today_str()
+        # 48 bits of randomness keeps collisions on the unique index negligible
+        unique = uuid.uuid4().hex[:12].upper()
+        return f"TXN-{prefix}-{unique}"
+
+
+class RequestEvent(models.Model):
+    """Append-only audit trail for a DocumentRequest (cancellations, refunds, ...)"""
+    
+    EVENT_TYPES = [
+        ('cancelled', 'Cancelled by user'),
+        ('refunded', 'Refund issued'),
+    ]
+    
+    request = models.ForeignKey(
+        DocumentRequest,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    detail = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Request Event'
+        verbose_name_plural = 'Request Events'
+        indexes = [
+            models.Index(fields=['request', '-created_at'], name='reqevent_request_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+# ✅ Drop the cached dashboard counters whenever a counted row changes
+# (queryset.update() skips signals; the 60s TTL covers those)
+@receiver(post_save, sender=DocumentRequest)
+@receiver(post_delete, sender=DocumentRequest)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=PaymentTransaction)
+@receiver(post_delete, sender=PaymentTransaction)
+def invalidate_dashboard_stats(sender, raw=False, **kwargs):
+    if not raw:
+        cache.delete(ADMIN_DASHBOARD_STATS_KEY)
@@ -1,3 +1,279 @@
-from django.test import TestCase
+import html
+import re
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .forms import RegisterForm
+from .models import DocumentRequest, PaymentTransaction, UserProfile, ADMIN_DASHBOARD_STATS_KEY
+
+
+# ✅ Plain static storage (no collectstatic manifest) and no https redirect for the test client
+TEST_SETTINGS = {
+    'SECURE_SSL_REDIRECT': False,
+    'STORAGES': {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class PaymentFlowTests(TestCase):
+    """simulated_payment and the admin mark_paid action"""
+
+    def setUp(self):
+        self.student = User.objects.create_user('20240001', password='pw')
+        self.staff = User.objects.create_user('20240002', password='pw', is_staff=True)
+        self.doc_request = DocumentRequest.objects.create(
+            user=self.student, document_type='transcript', purpose='Employment'
+        )
+
+    def payments(self):
+        return PaymentTransaction.objects.filter(request=self.doc_request, transaction_type='payment')
+
+    def refund(self):
+        DocumentRequest.objects.filter(pk=self.doc_request.pk).update(payment_status='refunded')
+
+    def test_simulated_payment_records_one_payment(self):
+        self.client.force_login(self.student)
+        url = reverse('simulated_payment', args=[self.doc_request.order_id])
+
+        response = self.client.post(url, {'action': 'simulate_success'})
+        self.assertRedirects(response, reverse('request_success', args=[self.doc_request.order_id]))
+        self.doc_request.refresh_from_db()
+        self.assertEqual(self.doc_request.payment_status, 'paid')
+        self.assertEqual(self.payments().count(), 1)
+
+        # A second submit of the same order is turned away without another row
+        self.client.post(url, {'action': 'simulate_success'})
+        self.assertEqual(self.payments().count(), 1)
+
+    def test_paying_refunded_request_again(self):
+        self.client.force_login(self.student)
+        url = reverse('simulated_payment', args=[self.doc_request.order_id])
+        self.client.post(url, {'action': 'simulate_success'})
+        self.refund()
+
+        response = self.client.post(url, {'action': 'simulate_success'}, follow=True)
+        self.assertRedirects(response, reverse('request_detail', args=[self.doc_request.order_id]))
+        self.assertContains(response, 'A payment has already been recorded for this order.')
+        self.doc_request.refresh_from_db()
+        self.assertEqual(self.doc_request.payment_status, 'refunded')
+        self.assertEqual(self.payments().count(), 1)
+
+    def test_admin_mark_paid_on_refunded_request(self):
+        self.client.force_login(self.staff)
+        url = reverse('admin_request_detail', args=[self.doc_request.order_id])
+
+        self.client.post(url, {'action': 'mark_paid'})
+        self.assertEqual(self.payments().count(), 1)
+        self.refund()
+
+        response = self.client.post(url, {'action': 'mark_paid'}, follow=True)
+        self.assertContains(response, f'Payment for {self.doc_request.order_id} has already been recorded.')
+        self.doc_request.refresh_from_db()
+        self.assertEqual(self.doc_request.payment_status, 'refunded')
+        self.assertEqual(self.payments().count(), 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class AdminListEditCacheTests(TestCase):
+    """list_editable saves go through bulk_update, so they must clear the stats caches themselves"""
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('20240001', password='pw')
+        self.superuser = User.objects.create_superuser('20240099', 'admin@example.com', 'pw')
+        self.doc_request = DocumentRequest.objects.create(
+            user=self.student, document_type='transcript', purpose='Employment'
+        )
+
+    def test_list_edit_invalidates_stats(self):
+        self.assertEqual(DocumentRequest.get_user_stats(self.student)['pending'], 1)
+        cache.set(ADMIN_DASHBOARD_STATS_KEY, {'pending': 1}, 60)
+
+        self.client.force_login(self.superuser)
+        response = self.client.post(reverse('admin:docrequest_documentrequest_changelist'), {
+            'form-TOTAL_FORMS': '1',
+            'form-INITIAL_FORMS': '1',
+            'form-0-id': str(self.doc_request.pk),
+            'form-0-status': 'processing',
+            '_save': 'Save',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        self.doc_request.refresh_from_db()
+        self.assertEqual(self.doc_request.status, 'processing')
+        self.assertIsNone(cache.get(DocumentRequest.stats_cache_key(self.student.pk)))
+        self.assertIsNone(cache.get(ADMIN_DASHBOARD_STATS_KEY))
+        stats = DocumentRequest.get_user_stats(self.student)
+        self.assertEqual((stats['pending'], stats['processing']), (0, 1))
+
+
+@override_settings(**TEST_SETTINGS)
+class AdminRequestsKeysetTests(TestCase):
+    """admin_requests cursor pages keep every filter and never re-run the COUNT"""
+
+    NEXT_LINK = re.compile(r'href="(\?cursor=[^"]+)"')
+
+    def setUp(self):
+        self.staff = User.objects.create_user('20240002', password='pw', is_staff=True)
+        student = User.objects.create_user('20240001', password='pw')
+        for i in range(70):
+            DocumentRequest.objects.create(
+                user=student,
+                document_type='transcript' if i % 5 else 'diploma',
+                payment_method='cash' if i % 2 else 'online',
+                purpose='Employment',
+            )
+        self.client.force_login(self.staff)
+
+    def next_url(self, response):
+        match = self.NEXT_LINK.search(response.content.decode())
+        return reverse('admin_requests') + html.unescape(match.group(1)) if match else None
+
+    def test_cursor_pages_keep_filters(self):
+        expected = list(
+            DocumentRequest.objects.filter(document_type='transcript', payment_method='cash')
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        url = reverse('admin_requests') + '?document_type=transcript&payment_method=cash&page=1'
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [req.id for req in response.context['page_obj']]
+            if pages:
+                self.assertTrue(response.context['is_keyset_page'])
+                self.assertIsNone(response.context['filtered_count'])
+                self.assertIn('document_type=transcript', url)
+                self.assertIn('payment_method=cash', url)
+                self.assertNotIn('page=', url)
+            pages += 1
+            url = self.next_url(response)
+
+        self.assertEqual(pages, 2)
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('admin_requests') + '?cursor=garbage&cursor_id=x')
+        self.assertFalse(response.context['is_keyset_page'])
+        self.assertEqual(response.context['filtered_count'], 70)
+
+
+@override_settings(**TEST_SETTINGS)
+class AdminBulkActionCacheTests(TestCase):
+    """admin_requests bulk actions write with update()/bulk_update()/delete(), bypassing save()"""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('20240002', password='pw', is_staff=True)
+        self.students = [User.objects.create_user(f'2024001{i}', password='pw') for i in range(2)]
+        self.doc_requests = [
+            DocumentRequest.objects.create(user=student, document_type='transcript', purpose='Employment')
+            for student in self.students
+        ]
+        self.client.force_login(self.staff)
+
+    def prime_caches(self):
+        for student in self.students:
+            DocumentRequest.get_user_stats(student)
+        cache.set(ADMIN_DASHBOARD_STATS_KEY, {'pending': 2}, 60)
+
+    def bulk(self, action, doc_requests):
+        return self.client.post(reverse('admin_requests'), {
+            'bulk_action': action,
+            'selected_ids': ','.join(str(req.pk) for req in doc_requests),
+        })
+
+    def assert_stats_cleared(self, students):
+        self.assertIsNone(cache.get(ADMIN_DASHBOARD_STATS_KEY))
+        for student in students:
+            self.assertIsNone(cache.get(DocumentRequest.stats_cache_key(student.pk)))
+
+    def test_status_actions_clear_stats(self):
+        for action in ('mark_processing', 'mark_ready', 'mark_completed', 'reject'):
+            with self.subTest(action=action):
+                self.prime_caches()
+                self.assertEqual(self.bulk(action, self.doc_requests).status_code, 302)
+                self.assert_stats_cleared(self.students)
+
+        stats = DocumentRequest.get_user_stats(self.students[0])
+        self.assertEqual((stats['total'], stats['pending'], stats['completed']), (1, 0, 0))
+
+    def test_confirm_payment_clears_stats(self):
+        self.prime_caches()
+        self.bulk('confirm_payment', self.doc_requests[:1])
+        self.assert_stats_cleared(self.students[:1])
+        self.assertIsNotNone(cache.get(DocumentRequest.stats_cache_key(self.students[1].pk)))
+        self.doc_requests[0].refresh_from_db()
+        self.assertEqual(self.doc_requests[0].payment_status, 'paid')
+
+    def test_delete_clears_user_stats(self):
+        self.prime_caches()
+        self.bulk('delete', self.doc_requests)
+        self.assert_stats_cleared(self.students)
+        self.assertEqual(DocumentRequest.get_user_stats(self.students[0])['total'], 0)
+
+
+class RegisterSchoolIdTests(TestCase):
+    """RegisterForm.clean_school_id rejects IDs used as a username or a profile's School ID"""
+
+    def school_id_errors(self, school_id):
+        return RegisterForm(data={'school_id': school_id}).errors.get('school_id', [])
+
+    def test_taken_as_username(self):
+        User.objects.create_user('20230574', password='pw')
+        self.assertIn('This School ID is already registered', self.school_id_errors('20230574'))
+
+    def test_taken_as_profile_school_id(self):
+        user = User.objects.create_user('registrar', password='pw')
+        UserProfile.objects.create(user=user, school_id='20230575')
+        self.assertIn('This School ID is already registered', self.school_id_errors('20230575'))
+
+    def test_unused_school_id(self):
+        User.objects.create_user('20230574', password='pw')
+        self.assertEqual(self.school_id_errors('20230576'), [])
+
+
+@override_settings(**TEST_SETTINGS)
+class UserProfileAdminSearchTests(TestCase):
+    """Staff can find a student's profile by name in the Django admin"""
+
+    def test_search_by_first_and_last_name(self):
+        superuser = User.objects.create_superuser('20240099', 'admin@example.com', 'pw')
+        student = User.objects.create_user('20230574', password='pw', first_name='Maria', last_name='Santos')
+        profile = UserProfile.objects.create(user=student, school_id='20230574')
+        self.client.force_login(superuser)
+
+        url = reverse('admin:docrequest_userprofile_changelist')
+        for term in ('maria', 'Santos'):
+            with self.subTest(term=term):
+                response = self.client.get(url, {'q': term})
+                self.assertEqual(list(response.context['cl'].result_list), [profile])
+
+
+@override_settings(**TEST_SETTINGS)
+class RequestDocumentActiveRequestTests(TestCase):
+    """request_document refuses a second active request with a single lookup"""
+
+    def test_post_with_active_request(self):
+        student = User.objects.create_user('20240001', password='pw')
+        active = DocumentRequest.objects.create(user=student, document_type='transcript', purpose='Employment')
+        self.client.force_login(student)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('request'), {'document_type': 'diploma', 'purpose': 'Travel'})
+        self.assertContains(response, active.order_id)
+        self.assertEqual(DocumentRequest.objects.filter(user=student).count(), 1)
+
+        active_lookups = [
+            query['sql'] for query in queries.captured_queries
+            if 'docrequest_documentrequest' in query['sql'] and '"status" IN' in query['sql']
+        ]
+        self.assertEqual(len(active_lookups), 1)
@@ -1,20 +1,106 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.db import IntegrityError, transaction
 from django.db.models import Count, Q
 from django.core.paginator import Paginator
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from .forms import RegisterForm, LoginForm, DocumentRequestForm, ContactForm
-from .models import DocumentRequest, PaymentTransaction, UserProfile
-from datetime import date, datetime
-import uuid
+from .models import DocumentRequest, PaymentTransaction, RequestEvent, UserProfile, ADMIN_DASHBOARD_STATS_KEY
+from datetime import date
+import secrets
 import csv
+import io
+from itertools import islice
 
 from docrequest import models
 
+# Rows of history shown under the new-request form
+REQUEST_HISTORY_LIMIT = 50
+
+# Upper bound on ids accepted by one admin_requests bulk action
+MAX_BULK_SELECTION = 10_000
+
+# Rows serialized per writerows() call / streamed chunk in the CSV export
+EXPORT_CHUNK_ROWS = 2000
+
+
+class CountOptimizedPaginator(Paginator):
+    """Paginator whose COUNT drops select_related joins, annotations and ordering"""
+    
+    @cached_property
+    def count(self):
+        return self.object_list.values('pk').order_by().count()
+
+
+class PkPaginator(CountOptimizedPaginator):
+    """Paginator that slices primary keys first, then fetches the full rows for that page"""
+    
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        # The OFFSET walks a narrow pk-only subquery instead of full joined rows
+        page_pks = self.object_list.values('pk')[bottom:top]
+        return self._get_page(self.object_list.filter(pk__in=page_pks), number, self)
+
+
+def _get_active_request(request):
+    """request.user's active DocumentRequest, looked up at most once per HTTP request"""
+    if not hasattr(request, '_active_request'):
+        request._active_request = DocumentRequest.get_user_active_request(request.user)
+    return request._active_request
+
+
+def _parse_date_param(value):
+    """Parse a YYYY-MM-DD query parameter, returning None if it isn't a valid date"""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def _keyset_page(queryset, cursor, cursor_id, per_page):
+    """
+    Rows after (cursor, cursor_id) in -created_at, -id order, plus the cursor for the next page.
+    Returns None if the cursor params are missing or malformed.
+    """
+    try:
+        cursor_dt = parse_datetime(cursor)
+        cursor_id = int(cursor_id)
+    except (TypeError, ValueError):
+        return None
+    if cursor_dt is None:
+        return None
+    if timezone.is_naive(cursor_dt):
+        cursor_dt = timezone.make_aware(cursor_dt)
+    
+    # Seek straight to the cursor on the (-created_at, -id) index instead of skipping OFFSET rows
+    rows = list(queryset.filter(
+        Q(created_at__lt=cursor_dt) | Q(created_at=cursor_dt, id__lt=cursor_id)
+    )[:per_page + 1])
+    next_row = rows[per_page - 1] if len(rows) > per_page else None
+    return rows[:per_page], next_row
+
+
+def _form_errors_message(form):
+    """All of a form's errors as one message, so an invalid submit stores a single entry"""
+    return ' / '.join(
+        f'{field}: {error}'
+        for field, errors in form.errors.items()
+        for error in errors
+    )
+
 
 def index(request):
     """Landing page with login/register"""
@@ -24,29 +110,25 @@ def index(request):
             return redirect('admin_dashboard')
         return redirect('home')
     
-    login_form = LoginForm()
-    register_form = RegisterForm()
+    # Unbound forms are only built if the page is actually rendered
+    login_form = None
+    register_form = None
     
     if request.method == 'POST':
         if 'login_submit' in request.POST:
             login_form = LoginForm(request, data=request.POST)
             if login_form.is_valid():
-                school_id = login_form.cleaned_data.get('username')
-                password = login_form.cleaned_data.get('password')
-                user = authenticate(username=school_id, password=password)
+                # is_valid() already authenticated the user; don't hash the password twice
+                user = login_form.get_user()
+                login(request, user)
+                display_name = user.get_full_name() or user.username
+                messages.success(request, f'✅ Welcome back, {display_name}!')
                 
-                if user is not None:
-                    login(request, user)
-                    display_name = user.get_full_name() or school_id
-                    messages.success(request, f'✅ Welcome back, {display_name}!')
-                    
-                    # ✅ Redirect based on role
-                    if user.is_staff or user.is_superuser:
-                        return redirect('admin_dashboard')
-                    else:
-                        return redirect('home')
+                # ✅ Redirect based on role
+                if user.is_staff or user.is_superuser:
+                    return redirect('admin_dashboard')
                 else:
-                    messages.error(request, '❌ Invalid School ID or password.')
+                    return redirect('home')
             else:
                 messages.error(request, '❌ Invalid School ID or password. Please check your credentials.')
 
@@ -75,13 +157,11 @@ def index(request):
                 
                 return redirect('index')
             else:
-                for field, errors in register_form.errors.items():
-                    for error in errors:
-                        messages.error(request, f'{field}: {error}')
+                messages.error(request, _form_errors_message(register_form))
     
     context = {
-        'login_form': login_form,
-        'register_form': register_form,
+        'login_form': login_form or LoginForm(),
+        'register_form': register_form or RegisterForm(),
     }
     return render(request, 'index.html', context)
 
@@ -89,26 +169,26 @@ def index(request):
 @login_required
 def home(request):
     """User dashboard/home page"""
-    recent_requests = DocumentRequest.objects.filter(user=request.user).order_by('-created_at')[:5]
+    recent_requests = DocumentRequest.objects.filter(user=request.user).only(
+        'order_id', 'document_type', 'purpose', 'status', 'payment_status',
+        'ready_for_pickup', 'picked_up', 'created_at'
+    ).order_by('-created_at')[:5]
     
-    total_requests = DocumentRequest.objects.filter(user=request.user).count()
-    pending_requests = DocumentRequest.objects.filter(user=request.user, status='pending').count()
-    ready_requests = DocumentRequest.objects.filter(user=request.user, ready_for_pickup=True, picked_up=False).count()
-    completed_requests = DocumentRequest.objects.filter(user=request.user, status='completed').count()
+    # Counters come from the short-lived per-user cache
+    stats = DocumentRequest.get_user_stats(request.user)
     
-    user_profile = None
-    if hasattr(request.user, 'profile'):
-        user_profile = request.user.profile
+    # One lookup; the profile stays cached on request.user for base.html
+    user_profile = getattr(request.user, 'profile', None)
     
     # ✅ Get active request
-    active_request = DocumentRequest.get_user_active_request(request.user)
+    active_request = _get_active_request(request)
     
     context = {
         'recent_requests': recent_requests,
-        'total_requests': total_requests,
-        'pending_requests': pending_requests,
-        'ready_requests': ready_requests,
-        'completed_requests': completed_requests,
+        'total_requests': stats['total'],
+        'pending_requests': stats['pending'],
+        'ready_requests': stats['ready_for_pickup'],
+        'completed_requests': stats['completed'],
         'user_profile': user_profile,
         'active_request': active_request,  # ✅ Pass to template
     }
@@ -118,29 +198,31 @@ def home(request):
 def request_document(request):
     """Create a new document request with active request limit"""
     
-    # ✅ Get active request first
-    active_request = DocumentRequest.get_user_active_request(request.user)
+    # ✅ Check if user already has an active request (one lookup; the same row is
+    # reused for the warning and when the page is rendered)
+    active_request = _get_active_request(request) if request.method == 'POST' else None
+    has_active_request = active_request is not None
     
-    # ✅ Check if user already has an active request
-    if active_request and request.method == 'POST':
+    if has_active_request:
         messages.warning(
             request,
-            f'⚠️ You already have an active request (Order ID: <strong>{active_request.order_id}</strong>). '
-            f'Status: <strong>{active_request.get_status_display()}</strong>. '
-            f'Please wait until it is completed or rejected before submitting a new request.',
+            format_html(
+                '⚠️ You already have an active request (Order ID: <strong>{}</strong>). '
+                'Status: <strong>{}</strong>. '
+                'Please wait until it is completed or rejected before submitting a new request.',
+                active_request.order_id,
+                active_request.get_status_display()
+            ),
             extra_tags='safe'
         )
         # Don't redirect - just show the form with the error
     
-    if request.method == 'POST' and not active_request:
+    if request.method == 'POST' and not has_active_request:
         form = DocumentRequestForm(request.POST, user=request.user)
         if form.is_valid():
             doc_request = form.save(commit=False)
             doc_request.user = request.user
-            
-            if not doc_request.school_id and hasattr(request.user, 'profile'):
-                doc_request.school_id = request.user.profile.school_id
-            
+            # save() fills school_id from request.user.profile, which the form already loaded
             doc_request.save()
             
             if doc_request.payment_method == 'cash':
@@ -156,19 +238,27 @@ def request_document(request):
                 return redirect('simulated_payment', order_id=doc_request.order_id)
         else:
             # Show form errors
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
+            messages.error(request, _form_errors_message(form))
     else:
         form = DocumentRequestForm(user=request.user)
     
-    # ✅ Always get user's request history
-    my_requests = DocumentRequest.objects.filter(user=request.user).order_by('-created_at')
+    # ✅ User's recent request history (bounded; only built when the page renders)
+    history = DocumentRequest.objects.filter(user=request.user)
+    my_requests = list(history.only(
+        'order_id', 'document_type', 'purpose', 'status', 'payment_method',
+        'payment_status', 'payment_amount', 'ready_for_pickup', 'picked_up', 'created_at'
+    ).order_by('-created_at')[:REQUEST_HISTORY_LIMIT])
+    # A short page is the whole history; only count when it was cut off
+    if len(my_requests) < REQUEST_HISTORY_LIMIT:
+        my_requests_total = len(my_requests)
+    else:
+        my_requests_total = history.count()
     
     context = {
         'form': form,
         'my_requests': my_requests,
-        'active_request': active_request,  # ✅ Pass active request to template
+        'my_requests_total': my_requests_total,
+        'active_request': _get_active_request(request),  # ✅ Pass active request to template
     }
     return render(request, 'request.html', context)
 
@@ -181,33 +271,44 @@ def simulated_payment(request, order_id):
         messages.info(request, 'This order has already been paid.')
         return redirect('request_success', order_id=doc_request.order_id)
     
+    # A refunded order keeps its payment row, and only one is allowed per request
+    if doc_request.payment_transactions.filter(transaction_type='payment').exists():
+        messages.info(request, 'A payment has already been recorded for this order.')
+        return redirect('request_detail', order_id=doc_request.order_id)
+    
     if request.method == 'POST':
         action = request.POST.get('action')
         
         if action == 'simulate_success':
             doc_request.payment_status = 'paid'
             doc_request.payment_date = timezone.now()
-            doc_request.payment_reference = f"SIM-{uuid.uuid4().hex[:8].upper()}"
-            doc_request.save()
+            doc_request.payment_reference = f"SIM-{secrets.token_hex(6).upper()}"
             
-            # ✅ Create payment transaction record
-            from .models import PaymentTransaction
-            PaymentTransaction.objects.create(
-                request=doc_request,
-                transaction_type='payment',
-                amount=doc_request.payment_amount,
-                status='completed',
-                payment_method=doc_request.payment_method,
-                processed_at=timezone.now(),
-                notes=f"Payment completed via {doc_request.get_payment_method_display()}"
-            )
+            try:
+                with transaction.atomic():
+                    doc_request.save(update_fields=['payment_status', 'payment_date', 'payment_reference', 'updated_at'])
+                    
+                    # ✅ Create payment transaction record
+                    PaymentTransaction.objects.create(
+                        request=doc_request,
+                        transaction_type='payment',
+                        amount=doc_request.payment_amount,
+                        status='completed',
+                        payment_method=doc_request.payment_method,
+                        processed_at=timezone.now(),
+                        notes=f"Payment completed via {doc_request.get_payment_method_display()}"
+                    )
+            except IntegrityError:
+                # Lost a race with another submit of the same order
+                messages.info(request, 'A payment has already been recorded for this order.')
+                return redirect('request_detail', order_id=doc_request.order_id)
             
             messages.success(request, f'✅ Payment successful! Reference: {doc_request.payment_reference}')
             return redirect('request_success', order_id=doc_request.order_id)
         
         elif action == 'simulate_failure':
             doc_request.payment_status = 'failed'
-            doc_request.save()
+            doc_request.save(update_fields=['payment_status', 'updated_at'])
             
             messages.error(request, '❌ Payment failed! Please try again.')
             return redirect('simulated_payment', order_id=doc_request.order_id)
@@ -227,7 +328,11 @@ def request_success(request, order_id):
 @login_required
 def my_requests(request):
     """View all user requests with enhanced filtering"""
-    requests = DocumentRequest.objects.filter(user=request.user).order_by('-created_at')
+    # Only the columns the list renders (notes and the academic fields stay in the DB)
+    requests = DocumentRequest.objects.filter(user=request.user).only(
+        'order_id', 'document_type', 'purpose', 'status', 'payment_method',
+        'payment_status', 'payment_amount', 'created_at'
+    ).order_by('-created_at')
     
     # Status filter
     status_filter = request.GET.get('status', '')
@@ -257,41 +362,40 @@ def my_requests(request):
     date_to = request.GET.get('date_to', '')
     
     if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
             requests = requests.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
-            pass
     
     if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
             requests = requests.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
-            pass
     
     # Calculate statistics
-    total_count = DocumentRequest.objects.filter(user=request.user).count()
-    pending_count = DocumentRequest.objects.filter(user=request.user, status='pending').count()
-    processing_count = DocumentRequest.objects.filter(user=request.user, status='processing').count()
-    ready_count = DocumentRequest.objects.filter(user=request.user, status='ready').count()
-    completed_count = DocumentRequest.objects.filter(user=request.user, status='completed').count()
+    # Totals cover all of the user's requests, regardless of the filters above
+    counts = DocumentRequest.get_user_stats(request.user)
+    
+    active_request = _get_active_request(request)
     
-    active_request = DocumentRequest.get_user_active_request(request.user)
+    # Pagination
+    paginator = PkPaginator(requests, 25)  # 25 requests per page
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
     
     context = {
-        'requests': requests,
+        'requests': page_obj,
+        'page_obj': page_obj,
         'status_filter': status_filter,
         'payment_filter': payment_filter,
         'document_filter': document_filter,
         'search_query': search_query,
         'date_from': date_from,
         'date_to': date_to,
-        'total_count': total_count,
-        'pending_count': pending_count,
-        'processing_count': processing_count,
-        'ready_count': ready_count,
-        'completed_count': completed_count,
+        'total_count': counts['total'],
+        'pending_count': counts['pending'],
+        'processing_count': counts['processing'],
+        'ready_count': counts['ready'],
+        'completed_count': counts['completed'],
         'active_request': active_request,  # ✅ Pass to template
     }
     return render(request, 'my_requests.html', context)
@@ -301,7 +405,10 @@ def my_requests(request):
 def request_detail(request, order_id):
     """View request details"""
     doc_request = get_object_or_404(DocumentRequest, order_id=order_id, user=request.user)
-    context = {'doc_request': doc_request}
+    context = {
+        'doc_request': doc_request,
+        'events': doc_request.events.all()[:10],
+    }
     return render(request, 'request_detail.html', context)
 
 
@@ -340,97 +447,112 @@ def logout_view(request):
 # REGISTRAR/ADMIN VIEWS
 # ========================================
 
+def _compute_dashboard_stats():
+    """Every admin_dashboard counter; cached under ADMIN_DASHBOARD_STATS_KEY"""
+    from django.db.models import Case, CharField, Sum, Value, When
+    
+    # Today's Statistics
+    today = date.today()
+    
+    # Request, payment, pickup and today's statistics in one pass over the table
+    request_stats = DocumentRequest.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        processing=Count('id', filter=Q(status='processing')),
+        ready=Count('id', filter=Q(status='ready')),
+        completed=Count('id', filter=Q(status='completed')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        paid=Count('id', filter=Q(payment_status='paid')),
+        unpaid=Count('id', filter=Q(payment_status='unpaid')),
+        failed_pay=Count('id', filter=Q(payment_status='failed')),
+        online=Count('id', filter=Q(payment_method='online')),
+        cash=Count('id', filter=Q(payment_method='cash')),
+        ready_pickup=Count('id', filter=Q(ready_for_pickup=True, picked_up=False)),
+        picked_up=Count('id', filter=Q(picked_up=True)),
+        today_req=Count('id', filter=Q(created_at__date=today)),
+        today_pay=Count('id', filter=Q(payment_status='paid', payment_date__date=today)),
+    )
+    
+    # User Statistics
+    user_stats = UserProfile.objects.aggregate(
+        total=Count('id'),
+        students=Count('id', filter=Q(role='student')),
+        alumni=Count('id', filter=Q(role='alumni')),
+        faculty=Count('id', filter=Q(role='faculty')),
+        verified=Count('id', filter=Q(is_verified=True)),
+        unverified=Count('id', filter=Q(is_verified=False)),
+    )
+    
+    # Document Type Breakdown (display label resolved in SQL)
+    document_labels = Case(
+        *[When(document_type=code, then=Value(label)) for code, label in DocumentRequest.DOCUMENT_TYPES],
+        default='document_type',
+        output_field=CharField()
+    )
+    document_breakdown = list(DocumentRequest.objects.values('document_type').annotate(
+        count=Count('id'),
+        label=document_labels
+    ).order_by('-count'))
+
+    # Payment Transactions Summary
+    txn_stats = PaymentTransaction.objects.aggregate(
+        revenue=Sum('amount', filter=Q(transaction_type='payment', status='completed')),
+        refunded=Sum('amount', filter=Q(transaction_type='refund', status='completed')),
+        pending_refunds=Count('id', filter=Q(transaction_type='refund', status='pending')),
+    )
+    
+    return {
+        'requests': request_stats,
+        'users': user_stats,
+        'document_breakdown': document_breakdown,
+        'txns': txn_stats,
+    }
+
+
 @staff_member_required
 def admin_dashboard(request):
     """Enhanced admin dashboard"""
 
     from .models import ContactMessage, PaymentTransaction
-    from django.db.models import Sum
 
-    # Request Statistics
-    total_requests = DocumentRequest.objects.count()
-    pending_requests = DocumentRequest.objects.filter(status='pending').count()
-    processing_requests = DocumentRequest.objects.filter(status='processing').count()
-    ready_requests = DocumentRequest.objects.filter(status='ready').count()
-    completed_requests = DocumentRequest.objects.filter(status='completed').count()
-    rejected_requests = DocumentRequest.objects.filter(status='rejected').count()
-    
-    # Payment Statistics
-    paid_requests = DocumentRequest.objects.filter(payment_status='paid').count()
-    unpaid_requests = DocumentRequest.objects.filter(payment_status='unpaid').count()
-    failed_payments = DocumentRequest.objects.filter(payment_status='failed').count()
-    online_payments = DocumentRequest.objects.filter(payment_method='online').count()
-    cash_payments = DocumentRequest.objects.filter(payment_method='cash').count()
-    
-    # Pickup Statistics
-    ready_for_pickup = DocumentRequest.objects.filter(ready_for_pickup=True, picked_up=False).count()
-    picked_up = DocumentRequest.objects.filter(picked_up=True).count()
-    
-    # User Statistics
-    total_users = UserProfile.objects.count()
-    student_users = UserProfile.objects.filter(role='student').count()
-    alumni_users = UserProfile.objects.filter(role='alumni').count()
-    faculty_users = UserProfile.objects.filter(role='faculty').count()
-    verified_users = UserProfile.objects.filter(is_verified=True).count()
-    unverified_users = UserProfile.objects.filter(is_verified=False).count()
+    # Counters are shared by all staff and rebuilt at most once a minute (or
+    # sooner: saves and deletes of the counted models drop the cache entry)
+    stats = cache.get_or_set(ADMIN_DASHBOARD_STATS_KEY, _compute_dashboard_stats, 60)
+    request_stats = stats['requests']
+    user_stats = stats['users']
+    total_revenue = stats['txns']['revenue'] or 0
+    total_refunded = stats['txns']['refunded'] or 0
+    pending_refunds_count = stats['txns']['pending_refunds']
     
     # Recent Activity
     recent_requests = DocumentRequest.objects.select_related('user').order_by('-created_at')[:10]
     recent_users = UserProfile.objects.select_related('user').order_by('-created_at')[:5]
     
-    # Document Type Breakdown
-    document_breakdown = DocumentRequest.objects.values('document_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Today's Statistics
-    today = date.today()
-    today_requests = DocumentRequest.objects.filter(created_at__date=today).count()
-    today_payments = DocumentRequest.objects.filter(
-        payment_status='paid',
-        payment_date__date=today
-    ).count()
-
-    # Payment Transactions Summary
-    total_revenue = PaymentTransaction.objects.filter(
-        transaction_type='payment',
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    total_refunded = PaymentTransaction.objects.filter(
-        transaction_type='refund',
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    pending_refunds_count = PaymentTransaction.objects.filter(
-        transaction_type='refund',
-        status='pending'
-    ).count()
     context = {
-        'total_requests': total_requests,
-        'pending_requests': pending_requests,
-        'processing_requests': processing_requests,
-        'ready_requests': ready_requests,
-        'completed_requests': completed_requests,
-        'rejected_requests': rejected_requests,
-        'paid_requests': paid_requests,
-        'unpaid_requests': unpaid_requests,
-        'failed_payments': failed_payments,
-        'online_payments': online_payments,
-        'cash_payments': cash_payments,
-        'ready_for_pickup': ready_for_pickup,
-        'picked_up': picked_up,
+        'total_requests': request_stats['total'],
+        'pending_requests': request_stats['pending'],
+        'processing_requests': request_stats['processing'],
+        'ready_requests': request_stats['ready'],
+        'completed_requests': request_stats['completed'],
+        'rejected_requests': request_stats['rejected'],
+        'paid_requests': request_stats['paid'],
+        'unpaid_requests': request_stats['unpaid'],
+        'failed_payments': request_stats['failed_pay'],
+        'online_payments': request_stats['online'],
+        'cash_payments': request_stats['cash'],
+        'ready_for_pickup': request_stats['ready_pickup'],
+        'picked_up': request_stats['picked_up'],
         'recent_requests': recent_requests,
         'recent_users': recent_users,
-        'document_breakdown': document_breakdown,
-        'today_requests': today_requests,
-        'today_payments': today_payments,
-        'total_users': total_users,
-        'student_users': student_users,
-        'alumni_users': alumni_users,
-        'faculty_users': faculty_users,
-        'verified_users': verified_users,
-        'unverified_users': unverified_users,
+        'document_breakdown': stats['document_breakdown'],
+        'today_requests': request_stats['today_req'],
+        'today_payments': request_stats['today_pay'],
+        'total_users': user_stats['total'],
+        'student_users': user_stats['students'],
+        'alumni_users': user_stats['alumni'],
+        'faculty_users': user_stats['faculty'],
+        'verified_users': user_stats['verified'],
+        'unverified_users': user_stats['unverified'],
     }
     return render(request, 'admin_dashboard.html', context)
 
@@ -448,20 +570,27 @@ def admin_requests(request):
             messages.error(request, '❌ No requests selected.')
             return redirect('admin_requests')
         
-        # Convert comma-separated IDs to list
+        # Convert comma-separated IDs to a de-duplicated list
         try:
-            selected_ids_list = [int(id.strip()) for id in selected_ids.split(',') if id.strip()]
+            selected_ids_list = list({int(id.strip()) for id in selected_ids.split(',') if id.strip()})
         except ValueError:
             messages.error(request, '❌ Invalid selection.')
             return redirect('admin_requests')
         
+        if len(selected_ids_list) > MAX_BULK_SELECTION:
+            messages.error(request, f'❌ Too many requests selected (max {MAX_BULK_SELECTION}).')
+            return redirect('admin_requests')
+        
         if not selected_ids_list:
             messages.error(request, '❌ Invalid selection.')
             return redirect('admin_requests')
         
         # Get selected requests
         selected_requests = DocumentRequest.objects.filter(id__in=selected_ids_list)
-        count = selected_requests.count()
+        # One user_id per selected row: the write branches below skip save() and signals,
+        # so they clear these users' cached stats (and the dashboard's) themselves
+        selected_user_ids = list(selected_requests.values_list('user_id', flat=True))
+        count = len(selected_user_ids)
         
         if count == 0:
             messages.error(request, '❌ No valid requests found.')
@@ -471,10 +600,12 @@ def admin_requests(request):
         try:
             if bulk_action == 'mark_processing':
                 selected_requests.update(status='processing')
+                DocumentRequest.invalidate_cached_stats(selected_user_ids)
                 messages.success(request, f'✅ Successfully marked {count} request(s) as Processing.')
             
             elif bulk_action == 'mark_ready':
                 selected_requests.update(status='ready', ready_for_pickup=True)
+                DocumentRequest.invalidate_cached_stats(selected_user_ids)
                 messages.success(request, f'✅ Successfully marked {count} request(s) as Ready for Pickup.')
             
             elif bulk_action == 'mark_completed':
@@ -483,61 +614,101 @@ def admin_requests(request):
                     picked_up=True,
                     picked_up_date=timezone.now()
                 )
+                DocumentRequest.invalidate_cached_stats(selected_user_ids)
                 messages.success(request, f'✅ Successfully marked {count} request(s) as Completed.')
             
             elif bulk_action == 'confirm_payment':
-                updated = 0
-                for req in selected_requests.filter(payment_status='unpaid'):
+                # Each row needs its own reference, so set them in Python and write them in one UPDATE
+                now = timezone.now()
+                unpaid = list(selected_requests.filter(payment_status='unpaid').only('id', 'user_id'))
+                for req in unpaid:
                     req.payment_status = 'paid'
-                    req.payment_date = timezone.now()
-                    req.payment_reference = f"BULK-{uuid.uuid4().hex[:8].upper()}"
-                    req.save()
-                    updated += 1
+                    req.payment_date = now
+                    req.payment_reference = f"BULK-{secrets.token_hex(6).upper()}"
+                    req.updated_at = now
+                DocumentRequest.objects.bulk_update(
+                    unpaid,
+                    ['payment_status', 'payment_date', 'payment_reference', 'updated_at'],
+                    batch_size=1000
+                )
+                DocumentRequest.invalidate_cached_stats(req.user_id for req in unpaid)
+                updated = len(unpaid)
                 messages.success(request, f'✅ Successfully confirmed payment for {updated} request(s).')
             
             elif bulk_action == 'reject':
                 selected_requests.update(status='rejected')
+                DocumentRequest.invalidate_cached_stats(selected_user_ids)
                 messages.warning(request, f'⚠️ Successfully rejected {count} request(s).')
             
             elif bulk_action == 'delete':
-            # Log deleted requests for the message
-                deleted_orders = list(selected_requests.values_list('order_id', flat=True))
+                # QuerySet.delete() never calls DocumentRequest.delete(), which drops the user key
                 selected_requests.delete()
+                DocumentRequest.invalidate_cached_stats(selected_user_ids)
                 messages.success(
                     request, 
                     f'✅ Successfully deleted {count} request(s).'
                 )
 
             elif bulk_action == 'export_selected':
-                # Export selected requests to CSV
-                response = HttpResponse(content_type='text/csv')
-                response['Content-Disposition'] = f'attachment; filename="requests_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-                
-                writer = csv.writer(response)
-                writer.writerow([
-                    'Order ID', 'Student Name', 'Student ID', 'Email', 
-                    'Document Type', 'Status', 'Payment Status', 
-                    'Payment Method', 'Payment Amount', 'Created Date', 
-                    'Ready for Pickup', 'Picked Up'
-                ])
+                # Export selected requests to CSV, streamed in chunks
+                document_labels = dict(DocumentRequest.DOCUMENT_TYPES)
+                status_labels = dict(DocumentRequest.STATUS_CHOICES)
+                payment_status_labels = dict(DocumentRequest.PAYMENT_STATUS_CHOICES)
+                payment_method_labels = dict(DocumentRequest.PAYMENT_METHOD_CHOICES)
                 
-                for req in selected_requests:
+                def export_rows():
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
                     writer.writerow([
-                        req.order_id,
-                        req.user.get_full_name(),
-                        req.user.username,
-                        req.user.email,
-                        req.get_document_type_display(),
-                        req.get_status_display(),
-                        req.get_payment_status_display(),
-                        req.get_payment_method_display(),
-                        f"₱{req.payment_amount}",
-                        req.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        'Yes' if req.ready_for_pickup else 'No',
-                        'Yes' if req.picked_up else 'No'
+                        'Order ID', 'Student Name', 'Student ID', 'Email', 
+                        'Document Type', 'Status', 'Payment Status', 
+                        'Payment Method', 'Payment Amount', 'Created Date', 
+                        'Ready for Pickup', 'Picked Up'
                     ])
+                    # Raw tuples straight off the cursor in chunks: no model instances, and
+                    # choice labels come from the dicts above instead of get_*_display() per row
+                    columns = selected_requests.values_list(
+                        'order_id', 'user__first_name', 'user__last_name', 'user__username',
+                        'user__email', 'document_type', 'status', 'payment_status',
+                        'payment_method', 'payment_amount', 'created_at', 'ready_for_pickup', 'picked_up'
+                    ).iterator(chunk_size=EXPORT_CHUNK_ROWS)
+                    rows = (
+                        (
+                            order_id,
+                            f"{first_name} {last_name}".strip(),
+                            username,
+                            email,
+                            document_labels.get(document_type, document_type),
+                            status_labels.get(status, status),
+                            payment_status_labels.get(payment_status, payment_status),
+                            payment_method_labels.get(payment_method, payment_method),
+                            f"₱{payment_amount}",
+                            created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                            'Yes' if ready_for_pickup else 'No',
+                            'Yes' if picked_up else 'No'
+                        )
+                        for (
+                            order_id, first_name, last_name, username, email, document_type, status,
+                            payment_status, payment_method, payment_amount, created_at,
+                            ready_for_pickup, picked_up
+                        ) in columns
+                    )
+                    # writerows() serializes each chunk in one C-level loop
+                    for chunk in iter(lambda: list(islice(rows, EXPORT_CHUNK_ROWS)), []):
+                        writer.writerows(chunk)
+                        yield buffer.getvalue()
+                        buffer.seek(0)
+                        buffer.truncate()
+                    if buffer.tell():
+                        yield buffer.getvalue()
                 
-                return response
+                return StreamingHttpResponse(
+                    export_rows(),
+                    content_type='text/csv',
+                    headers={
+                        'Content-Disposition': f'attachment; filename="requests_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
+                    }
+                )
             
             else:
                 messages.error(request, '❌ Invalid bulk action.')
@@ -552,41 +723,60 @@ def admin_requests(request):
         return redirect('admin_requests')
     
     # ====== HANDLE FILTERS (GET) ======
-    requests = DocumentRequest.objects.all().select_related('user', 'user__profile').order_by('-created_at')
+    # The list renders req.user's name and username only; the profile is never read
+    requests = DocumentRequest.objects.select_related('user').only(
+        'order_id', 'document_type', 'status', 'payment_status', 'payment_method', 'created_at',
+        'user', 'user__first_name', 'user__last_name', 'user__username'
+    ).order_by('-created_at', '-id')
 
-    # Status filter
+    # Collect every exact-match filter and apply them in one .filter() call
     status_filter = request.GET.get('status', '')
-    if status_filter:
-        requests = requests.filter(status=status_filter)
-    
-    # Payment status filter
     payment_filter = request.GET.get('payment_status', '')
-    if payment_filter:
-        requests = requests.filter(payment_status=payment_filter)
-    
-    # Document type filter
     document_filter = request.GET.get('document_type', '')
-    if document_filter:
-        requests = requests.filter(document_type=document_filter)
-    
-    # Payment method filter
     payment_method_filter = request.GET.get('payment_method', '')
-    if payment_method_filter:
-        requests = requests.filter(payment_method=payment_method_filter)
+    filters = {
+        field: value
+        for field, value in (
+            ('status', status_filter),
+            ('payment_status', payment_filter),
+            ('document_type', document_filter),
+            ('payment_method', payment_method_filter),
+        )
+        if value
+    }
     
     # Pickup status filter
     pickup_filter = request.GET.get('pickup_status', '')
     if pickup_filter == 'ready':
-        requests = requests.filter(ready_for_pickup=True, picked_up=False)
+        filters.update(ready_for_pickup=True, picked_up=False)
     elif pickup_filter == 'picked_up':
-        requests = requests.filter(picked_up=True)
+        filters['picked_up'] = True
     elif pickup_filter == 'not_ready':
-        requests = requests.filter(ready_for_pickup=False, picked_up=False)
+        filters.update(ready_for_pickup=False, picked_up=False)
+    
+    # Date range filter
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    if date_from:
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
+            filters['created_at__date__gte'] = date_from_obj
+        else:
+            messages.warning(request, '⚠️ Invalid "from" date format. Use YYYY-MM-DD.')
+    
+    if date_to:
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
+            filters['created_at__date__lte'] = date_to_obj
+        else:
+            messages.warning(request, '⚠️ Invalid "to" date format. Use YYYY-MM-DD.')
     
     # Search query
+    search_q = Q()
     search_query = request.GET.get('search', '')
     if search_query:
-        requests = requests.filter(
+        search_q = (
             Q(order_id__icontains=search_query) |
             Q(user__first_name__icontains=search_query) |
             Q(user__last_name__icontains=search_query) |
@@ -595,47 +785,45 @@ def admin_requests(request):
             Q(document_type__icontains=search_query)
         )
     
-    # Date range filter
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    
-    if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-            requests = requests.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
-            messages.warning(request, '⚠️ Invalid "from" date format. Use YYYY-MM-DD.')
-    
-    if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-            requests = requests.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
-            messages.warning(request, '⚠️ Invalid "to" date format. Use YYYY-MM-DD.')
+    requests = requests.filter(search_q, **filters)
 
-    # Pagination
-    paginator = Paginator(requests, 20)  # 20 requests per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination: ?cursor=&cursor_id= seeks by keyset; ?page= is the LIMIT/OFFSET fallback
+    paginator = CountOptimizedPaginator(requests, 20)  # 20 requests per page
+    keyset = _keyset_page(
+        requests, request.GET.get('cursor'), request.GET.get('cursor_id'), paginator.per_page
+    )
+    if keyset is not None:
+        page_obj, next_row = keyset
+    else:
+        page_obj = paginator.get_page(request.GET.get('page'))
+        next_row = page_obj[-1] if page_obj.has_next() else None
 
-    # ✅ Calculate counts for all statuses (for stats cards)
-    all_requests = DocumentRequest.objects.all()
-    pending_count = all_requests.filter(status='pending').count()
-    processing_count = all_requests.filter(status='processing').count()
-    ready_count = all_requests.filter(status='ready').count()
-    completed_count = all_requests.filter(status='completed').count()
-    rejected_count = all_requests.filter(status='rejected').count()
+    # ✅ Calculate counts for all statuses (for stats cards) in one query
+    stats = DocumentRequest.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        processing=Count('id', filter=Q(status='processing')),
+        ready=Count('id', filter=Q(status='ready')),
+        completed=Count('id', filter=Q(status='completed')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        paid=Count('id', filter=Q(payment_status='paid')),
+        unpaid=Count('id', filter=Q(payment_status='unpaid')),
+    )
     
-    # Payment counts
-    paid_count = all_requests.filter(payment_status='paid').count()
-    unpaid_count = all_requests.filter(payment_status='unpaid').count()
+    # Offset pages already ran (and cached) this COUNT; keyset pages never need one
+    filtered_count = None if keyset is not None else paginator.count
     
-    # Total counts
-    total_count = all_requests.count()
-    filtered_count = requests.count()
+    # Filters for the pagination links, minus the paging params each link sets itself
+    pagination_query = request.GET.copy()
+    for key in ('page', 'cursor', 'cursor_id'):
+        pagination_query.pop(key, None)
 
     context = {
         'page_obj': page_obj,
+        'is_keyset_page': keyset is not None,
+        'next_cursor': next_row.created_at.isoformat() if next_row else '',
+        'next_cursor_id': next_row.id if next_row else '',
+        'pagination_query': pagination_query.urlencode(),
         'status_filter': status_filter,
         'payment_filter': payment_filter,
         'document_filter': document_filter,
@@ -644,14 +832,14 @@ def admin_requests(request):
         'search_query': search_query,
         'date_from': date_from,
         'date_to': date_to,
-        'pending_count': pending_count,
-        'processing_count': processing_count,
-        'ready_count': ready_count,
-        'completed_count': completed_count,
-        'rejected_count': rejected_count,
-        'paid_count': paid_count,
-        'unpaid_count': unpaid_count,
-        'total_count': total_count,
+        'pending_count': stats['pending'],
+        'processing_count': stats['processing'],
+        'ready_count': stats['ready'],
+        'completed_count': stats['completed'],
+        'rejected_count': stats['rejected'],
+        'paid_count': stats['paid'],
+        'unpaid_count': stats['unpaid'],
+        'total_count': stats['total'],
         'filtered_count': filtered_count,
     }
 
@@ -661,7 +849,11 @@ def admin_requests(request):
 @staff_member_required
 def admin_users(request):
     """Manage user profiles with enhanced filtering"""
-    profiles = UserProfile.objects.all().select_related('user').order_by('-created_at')
+    # Only the columns the user table renders
+    profiles = UserProfile.objects.select_related('user').only(
+        'school_id', 'role', 'is_verified', 'created_at',
+        'user', 'user__first_name', 'user__last_name', 'user__username', 'user__email'
+    ).order_by('-created_at')
     
     # Role filter
     role_filter = request.GET.get('role', '')
@@ -691,21 +883,21 @@ def admin_users(request):
     date_to = request.GET.get('date_to', '')
     
     if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
             profiles = profiles.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
+        else:
             messages.warning(request, '⚠️ Invalid "from" date format. Use YYYY-MM-DD.')
     
     if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
             profiles = profiles.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
+        else:
             messages.warning(request, '⚠️ Invalid "to" date format. Use YYYY-MM-DD.')
     
     # Pagination
-    paginator = Paginator(profiles, 20)  # 20 users per page
+    paginator = CountOptimizedPaginator(profiles, 20)  # 20 users per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -717,7 +909,7 @@ def admin_users(request):
     alumni_count = all_profiles.filter(role='alumni').count()
     faculty_count = all_profiles.filter(role='faculty').count()
     total_count = all_profiles.count()
-    filtered_count = profiles.count()
+    filtered_count = paginator.count
     
     context = {
         'page_obj': page_obj,
@@ -764,22 +956,32 @@ def admin_request_detail(request, order_id):
             messages.success(request, f'✅ Request {order_id} marked as Picked Up')
         
         elif action == 'mark_paid':
+            # A refunded request still has its payment row, and only one is allowed per request
+            if (doc_request.payment_status == 'paid'
+                    or doc_request.payment_transactions.filter(transaction_type='payment').exists()):
+                messages.info(request, f'Payment for {order_id} has already been recorded.')
+                return redirect('admin_request_detail', order_id=order_id)
+            
             doc_request.payment_status = 'paid'
             doc_request.payment_date = timezone.now()
-            doc_request.payment_reference = f"CASH-{uuid.uuid4().hex[:8].upper()}"
-            doc_request.save()
-
-            from .models import PaymentTransaction
-            PaymentTransaction.objects.create(
-                request=doc_request,
-                transaction_type='payment',
-                amount=doc_request.payment_amount,
-                status='completed',
-                payment_method=doc_request.payment_method,
-                processed_by=request.user,
-                processed_at=timezone.now(),
-                notes=f"Cash payment confirmed by admin"
-            )
+            doc_request.payment_reference = f"CASH-{secrets.token_hex(6).upper()}"
+            
+            try:
+                with transaction.atomic():
+                    doc_request.save()
+                    PaymentTransaction.objects.create(
+                        request=doc_request,
+                        transaction_type='payment',
+                        amount=doc_request.payment_amount,
+                        status='completed',
+                        payment_method=doc_request.payment_method,
+                        processed_by=request.user,
+                        processed_at=timezone.now(),
+                        notes=f"Cash payment confirmed by admin"
+                    )
+            except IntegrityError:
+                messages.info(request, f'Payment for {order_id} has already been recorded.')
+                return redirect('admin_request_detail', order_id=order_id)
             
             messages.success(request, f'✅ Cash payment confirmed for {order_id}')
         
@@ -840,8 +1042,12 @@ def admin_edit_user(request, profile_id):
         profile.is_verified = request.POST.get('is_verified') == 'on'
         
         try:
-            user.save()
-            profile.save()
+            # Only write the columns this form edits
+            user.save(update_fields=['first_name', 'last_name', 'email'])
+            profile.save(update_fields=[
+                'role', 'department', 'course', 'year_level',
+                'graduation_year', 'is_verified', 'updated_at'
+            ])
             messages.success(
                 request,
                 f'✅ Successfully updated profile for {user.get_full_name()} ({profile.school_id})'
@@ -864,13 +1070,14 @@ def admin_delete_user(request, profile_id):
         user_name = user.get_full_name()
         school_id = profile.school_id
         
-        # Check if user has any active requests
-        active_requests = DocumentRequest.objects.filter(
+        # Check if user has any active requests (EXISTS first; count only for the message)
+        active_qs = DocumentRequest.objects.filter(
             user=user,
-            status__in=['pending', 'processing', 'ready']
-        ).count()
+            status__in=DocumentRequest.ACTIVE_STATUSES
+        )
         
-        if active_requests > 0:
+        if active_qs.exists():
+            active_requests = active_qs.count()
             messages.warning(
                 request,
                 f'⚠️ Cannot delete user {user_name} ({school_id}). '
@@ -901,14 +1108,13 @@ def user_profile(request):
     profile = request.user.profile
     
     # Get user statistics
-    total_requests = DocumentRequest.objects.filter(user=request.user).count()
-    completed_requests = DocumentRequest.objects.filter(user=request.user, status='completed').count()
-    active_request = DocumentRequest.get_user_active_request(request.user)
+    stats = DocumentRequest.get_user_stats(request.user)
+    active_request = _get_active_request(request)
     
     context = {
         'profile': profile,
-        'total_requests': total_requests,
-        'completed_requests': completed_requests,
+        'total_requests': stats['total'],
+        'completed_requests': stats['completed'],
         'active_request': active_request,
     }
     return render(request, 'user_profile.html', context)
@@ -929,9 +1135,9 @@ def edit_profile(request):
         user.first_name = request.POST.get('first_name', '').strip()
         user.last_name = request.POST.get('last_name', '').strip()
         
-        # Email validation
+        # Email validation (only query for uniqueness when the address actually changed)
         new_email = request.POST.get('email', '').strip()
-        if new_email != user.email:
+        if new_email and new_email != user.email:
             if User.objects.filter(email=new_email).exclude(id=user.id).exists():
                 messages.error(request, '❌ This email is already in use.')
                 return redirect('edit_profile')
@@ -977,8 +1183,14 @@ def edit_profile(request):
             messages.success(request, '✅ Password updated successfully! Please log in again.')
         
         try:
-            user.save()
-            profile.save()
+            # Only write the columns this form edits
+            user_fields = ['first_name', 'last_name', 'email']
+            if new_password:
+                user_fields.append('password')
+            user.save(update_fields=user_fields)
+            profile.save(update_fields=[
+                'department', 'course', 'year_level', 'graduation_year', 'updated_at'
+            ])
             
             if new_password:
                 # Re-login after password change
@@ -1015,15 +1227,16 @@ def cancel_request(request, order_id):
         is_paid = doc_request.payment_status == 'paid'
         refund_amount = doc_request.payment_amount if is_paid else 0
         
-        # Update request status to rejected/cancelled
+        # Update request status to rejected/cancelled; the audit line goes to its own
+        # table instead of being appended to (and rewriting) the notes column
         doc_request.status = 'rejected'
-        cancellation_note = f"[CANCELLED BY USER on {timezone.now().strftime('%Y-%m-%d %H:%M')}]"
-        
-        if is_paid:
-            cancellation_note += f"\n[AUTOMATIC REFUND ISSUED: ₱{refund_amount}]"
-        
-        doc_request.notes = f"{doc_request.notes}\n\n{cancellation_note}" if doc_request.notes else cancellation_note
-        doc_request.save()
+        doc_request.cancelled_by_user = True
+        doc_request.save(update_fields=['status', 'cancelled_by_user', 'updated_at'])
+        RequestEvent.objects.create(
+            request=doc_request,
+            event_type='cancelled',
+            detail=f"Cancelled by user {request.user.username}"
+        )
         
         # ✅ Issue automatic refund if payment was made
         if is_paid:
@@ -1042,7 +1255,12 @@ def cancel_request(request, order_id):
             
             # Update payment status
             doc_request.payment_status = 'refunded'
-            doc_request.save()
+            doc_request.save(update_fields=['payment_status', 'updated_at'])
+            RequestEvent.objects.create(
+                request=doc_request,
+                event_type='refunded',
+                detail=f"Automatic refund of ₱{refund_amount} ({refund.reference_number})"
+            )
             
             messages.success(
                 request,
@@ -1088,17 +1306,17 @@ def admin_contact_messages(request):
     date_to = request.GET.get('date_to', '')
     
     if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
             messages_queryset = messages_queryset.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
+        else:
             messages.warning(request, '⚠️ Invalid "from" date format.')
     
     if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
             messages_queryset = messages_queryset.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
+        else:
             messages.warning(request, '⚠️ Invalid "to" date format.')
     
     # Pagination
@@ -1202,18 +1420,14 @@ def admin_payments(request):
     date_to = request.GET.get('date_to', '')
     
     if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
             transactions = transactions.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
-            pass
     
     if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
             transactions = transactions.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
-            pass
     
     # Pagination
     paginator = Paginator(transactions, 20)
@@ -1380,18 +1594,14 @@ def admin_payment_reports(request):
     transactions = PaymentTransaction.objects.filter(status='completed')
     
     if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_from_obj = _parse_date_param(date_from)
+        if date_from_obj:
             transactions = transactions.filter(created_at__date__gte=date_from_obj)
-        except ValueError:
-            pass
     
     if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        date_to_obj = _parse_date_param(date_to)
+        if date_to_obj:
             transactions = transactions.filter(created_at__date__lte=date_to_obj)
-        except ValueError:
-            pass
     
     # Daily revenue breakdown
     daily_revenue = transactions.filter(